@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Enhancement Benchmark Script
+Measures time and peak memory of the enhancement code paths against the
+reference implementations in enhance_reference.py
+"""
+
+import time
+import tracemalloc
+from pathlib import Path
+from PIL import Image
+import numpy as np
+
+import enhance_images_ai
+import enhance_reference
+
+def make_test_image(width, height, seed=0):
+    """
+    Create a deterministic photo-like RGB test image
+    (smooth gradients plus mild noise, so filters behave realistically)
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[:height, :width].astype(np.float32)
+    r = 128 + 80 * np.sin(x / 47.0) * np.cos(y / 61.0)
+    g = 110 + 60 * np.cos((x + y) / 83.0)
+    b = 90 + 70 * np.sin(y / 29.0)
+    img = np.stack([r, g, b], axis=-1) + rng.normal(0, 6, (height, width, 3))
+    return Image.fromarray(np.clip(img, 0, 255).astype(np.uint8))
+
+def measure(func, *args, repeat=1):
+    """
+    Run func(*args) and return (result, best seconds, peak traced MB)
+
+    Peak memory comes from tracemalloc, which sees NumPy buffers but not
+    Pillow's internal image storage.
+    """
+    best = float('inf')
+    peak_mb = 0.0
+    result = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = max(peak_mb, peak / (1024 * 1024))
+    return result, best, peak_mb
+
+def image_difference(img_a, img_b):
+    """Largest and mean per-channel difference between two images"""
+    a = np.asarray(img_a, dtype=np.int16)
+    b = np.asarray(img_b, dtype=np.int16)
+    diff = np.abs(a - b)
+    return int(diff.max()), float(diff.mean())
+
+def print_comparison(label, reference, current):
+    """Print one reference vs current row"""
+    _, ref_time, ref_peak = reference
+    _, cur_time, cur_peak = current
+    speedup = ref_time / cur_time if cur_time > 0 else float('inf')
+    print(f"{label:<24} {ref_time:8.3f}s {cur_time:8.3f}s {speedup:7.1f}x "
+          f"{ref_peak:9.1f}MB {cur_peak:8.1f}MB")
+
+def benchmark_pil_path(sizes):
+    """
+    Compare enhance_pil_image_advanced and apply_vignette_pil with the
+    reference implementations on synthetic images of the given sizes
+    """
+    print(f"{'PIL path':<24} {'reference':>9} {'current':>9} {'speedup':>8} "
+          f"{'ref peak':>11} {'cur peak':>10}")
+    print("-" * 78)
+    for width, height in sizes:
+        img = make_test_image(width, height)
+        label = f"{width}x{height}"
+
+        reference = measure(enhance_reference.apply_vignette_pil_reference, img, 0.12)
+        current = measure(enhance_images_ai.apply_vignette_pil, img, 0.12)
+        print_comparison(f"vignette {label}", reference, current)
+
+        reference = measure(enhance_reference.enhance_pil_image_advanced_reference, img)
+        enhance_images_ai.gradient_mask_array.cache_clear()
+        enhance_images_ai.vignette_mask_array.cache_clear()
+        current = measure(enhance_images_ai.enhance_pil_image_advanced, img)
+        print_comparison(f"full {label}", reference, current)
+        max_diff, mean_diff = image_difference(reference[0], current[0])
+        print(f"  difference: max {max_diff}, mean {mean_diff:.3f} levels")
+
+def load_bgr(image_path, max_dimension=None):
+    """Read an image with OpenCV, optionally downscaled to max_dimension"""
+    import cv2
+    img = cv2.imread(str(image_path))
+    if img is not None and max_dimension:
+        height, width = img.shape[:2]
+        scale = max_dimension / max(height, width)
+        if scale < 1:
+            img = cv2.resize(img, (int(width * scale), int(height * scale)),
+                             interpolation=cv2.INTER_AREA)
+    return img
+
+def benchmark_adaptive(image_files, max_dimension=1024):
+    """
+    Compare the fixed enhancement pipeline with adaptive stage selection
+    (analysis time included) across a set of images and report time saved
+    """
+    stage_names = ['clahe_clip', 'denoise_h', 'sharpen_amount']
+    skipped = {name: 0 for name in stage_names}
+    skipped['hsv'] = 0
+    total_full = 0.0
+    total_adaptive = 0.0
+    count = 0
+
+    print(f"{'Adaptive stages':<32} {'full':>8} {'adaptive':>9}  stages")
+    print("-" * 78)
+    for image_file in image_files:
+        img = load_bgr(image_file, max_dimension)
+        if img is None:
+            continue
+
+        def run_adaptive(img_bgr):
+            plan = enhance_images_ai.choose_enhancement_plan(
+                enhance_images_ai.analyze_image_stats(img_bgr))
+            return enhance_images_ai.enhance_array_advanced(img_bgr, plan), plan
+
+        _, full_time, _ = measure(enhance_images_ai.enhance_array_advanced, img)
+        (_, plan), adaptive_time, _ = measure(run_adaptive, img)
+        total_full += full_time
+        total_adaptive += adaptive_time
+        count += 1
+        for name in stage_names:
+            if not plan[name]:
+                skipped[name] += 1
+        if plan['saturation'] == 1 and plan['value'] == 1:
+            skipped['hsv'] += 1
+        print(f"{Path(image_file).name[:32]:<32} {full_time:7.2f}s {adaptive_time:8.2f}s  "
+              f"{enhance_images_ai.describe_plan(plan)}")
+
+    if count == 0:
+        print("No images found")
+        return
+    saved = (total_full - total_adaptive) / total_full * 100 if total_full > 0 else 0
+    print("-" * 78)
+    print(f"Total: {total_full:.1f}s full → {total_adaptive:.1f}s adaptive "
+          f"({saved:.1f}% time saved over {count} image(s))")
+    print("Skipped: " + ", ".join(f"{name.split('_')[0]} {n}/{count}"
+                                  for name, n in skipped.items()))
+
+def benchmark_batch(count=8, width=1280, height=960):
+    """
+    Compare per-image enhance_array_advanced with enhance_batch_advanced on
+    same-size synthetic images. The pointwise-only plan skips CLAHE,
+    denoising and sharpening, which isolates the stages batching targets.
+    """
+    import cv2
+    images = [cv2.cvtColor(np.asarray(make_test_image(width, height, seed=i)), cv2.COLOR_RGB2BGR)
+              for i in range(count)]
+    batch = np.stack(images)
+    plans = {
+        'full pipeline': None,
+        'pointwise only': dict(enhance_images_ai.DEFAULT_ENHANCEMENT_PLAN,
+                               clahe_clip=None, denoise_h=None, sharpen_amount=None),
+    }
+
+    print(f"{'Batch of ' + str(count) + f' x {width}x{height}':<24} {'per-image':>9} "
+          f"{'batch':>9} {'speedup':>8} {'img/s':>7} {'peak':>10}")
+    print("-" * 78)
+    for label, plan in plans.items():
+        def run_per_image():
+            return [enhance_images_ai.enhance_array_advanced(img, plan) for img in images]
+
+        single, single_time, single_peak = measure(run_per_image)
+        batched, batch_time, batch_peak = measure(enhance_images_ai.enhance_batch_advanced, batch, plan)
+        speedup = single_time / batch_time if batch_time > 0 else float('inf')
+        print(f"{label:<24} {single_time:8.3f}s {batch_time:8.3f}s {speedup:7.2f}x "
+              f"{count / batch_time:7.1f} {batch_peak:8.1f}MB")
+        max_diff, mean_diff = image_difference(np.stack(single), batched)
+        print(f"  per-image peak {single_peak:.1f}MB, difference: max {max_diff}, "
+              f"mean {mean_diff:.5f} levels")
+
+if __name__ == "__main__":
+    print("=" * 78)
+    print("Enhancement Benchmark")
+    print("=" * 78)
+    print()
+
+    # The reference masks are built pixel by pixel, so keep sizes modest
+    benchmark_pil_path([(320, 240), (640, 480)])
+    print()
+
+    if enhance_images_ai.OPENCV_AVAILABLE:
+        # Adaptive stage selection over the real assets (downscaled for speed)
+        assets_dir = Path(__file__).parent / "attached_assets"
+        image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+        image_files = sorted(f for f in assets_dir.iterdir()
+                             if f.suffix in image_extensions and f.is_file())
+        benchmark_adaptive(image_files, max_dimension=1024)
+        print()
+
+        benchmark_batch(count=8, width=1280, height=960)
+        print()
+    print("Done!")
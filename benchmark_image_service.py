@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Image Service Load Test
+Starts image_service.py locally on a temporary cache and measures p50/p99
+latency for cache misses and hits, request coalescing and LRU eviction
+"""
+
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+from urllib.request import urlopen
+from urllib.error import HTTPError
+import numpy as np
+
+from image_service import IMAGE_EXTENSIONS, create_server
+
+def fetch(url):
+    """GET a URL and return (seconds, status, X-Cache header, body bytes)"""
+    start = time.perf_counter()
+    try:
+        with urlopen(url, timeout=120) as response:
+            body = response.read()
+            return time.perf_counter() - start, response.status, response.headers.get('X-Cache'), len(body)
+    except HTTPError as e:
+        e.read()
+        return time.perf_counter() - start, e.code, None, 0
+
+def run_load(urls, concurrency):
+    """Fetch every URL with the given number of concurrent clients"""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(fetch, urls))
+
+def print_latencies(label, results):
+    """Print p50/p99/max latency (ms) and the X-Cache breakdown"""
+    seconds = np.array([r[0] for r in results]) * 1000
+    outcomes = {}
+    for _, status, cache, _ in results:
+        key = cache or str(status)
+        outcomes[key] = outcomes.get(key, 0) + 1
+    breakdown = ', '.join(f"{name} {count}" for name, count in sorted(outcomes.items()))
+    print(f"{label:<26} {len(results):6d} {np.percentile(seconds, 50):9.1f} "
+          f"{np.percentile(seconds, 99):9.1f} {seconds.max():9.1f}  {breakdown}")
+
+def get_stats(base_url):
+    with urlopen(f"{base_url}/_stats") as response:
+        return json.loads(response.read())
+
+def start_service(assets_dir, cache_dir, max_cache_mb):
+    """Run the service on a free local port in a background thread"""
+    server = create_server(assets_dir, cache_dir, host='127.0.0.1', port=0,
+                           max_cache_mb=max_cache_mb)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def load_test(assets_dir, widths=(320, 640, 1024), formats=('jpeg', 'webp'),
+              hit_requests=2000, concurrency=8, max_cache_mb=512):
+    """
+    Measure miss latency (every rendition requested once), hit latency
+    (random repeats of the same renditions) and coalescing (a burst of
+    identical requests for a rendition that isn't cached yet)
+    """
+    assets = sorted(f.name for f in Path(assets_dir).iterdir()
+                    if f.suffix in IMAGE_EXTENSIONS and f.is_file())
+    cache_dir = tempfile.mkdtemp(prefix='rendition-cache-')
+    server, base_url = start_service(assets_dir, cache_dir, max_cache_mb)
+    try:
+        urls = [f"{base_url}/{width}/{fmt}/{quote(asset)}"
+                for asset in assets for width in widths for fmt in formats]
+        print(f"{len(assets)} asset(s), {len(urls)} rendition(s), {concurrency} concurrent client(s)")
+        print(f"{'Phase':<26} {'reqs':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}  outcomes")
+        print("-" * 78)
+
+        print_latencies('miss (first request)', run_load(urls, concurrency))
+
+        rng = random.Random(0)
+        hit_urls = [rng.choice(urls) for _ in range(hit_requests)]
+        print_latencies('hit (cached)', run_load(hit_urls, concurrency))
+
+        # A rendition nobody asked for yet, requested by every client at once
+        burst_url = f"{base_url}/1600/jpeg/{quote(assets[0])}"
+        renders_before = get_stats(base_url)['misses']
+        print_latencies('burst (same rendition)', run_load([burst_url] * concurrency * 2, concurrency * 2))
+        renders = get_stats(base_url)['misses'] - renders_before
+        print(f"  burst of {concurrency * 2} identical requests rendered {renders} time(s)")
+
+        stats = get_stats(base_url)
+        print("-" * 78)
+        print(f"Cache: {stats['cache_entries']} rendition(s), "
+              f"{stats['cache_bytes'] / (1024 * 1024):.1f}MB")
+        print(f"Render time: {stats['render_seconds']:.1f}s total, "
+              f"{stats['render_seconds'] / max(1, stats['misses']) * 1000:.0f}ms per rendition "
+              f"(miss latency above includes queueing behind other renders)")
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def eviction_test(assets_dir, max_cache_mb=2, width=640, fmt='jpeg'):
+    """
+    Fill a deliberately small cache and check it stays within its budget,
+    evicting least recently used renditions
+    """
+    assets = sorted(f.name for f in Path(assets_dir).iterdir()
+                    if f.suffix in IMAGE_EXTENSIONS and f.is_file())
+    cache_dir = tempfile.mkdtemp(prefix='rendition-cache-')
+    server, base_url = start_service(assets_dir, cache_dir, max_cache_mb)
+    try:
+        urls = [f"{base_url}/{width}/{fmt}/{quote(asset)}" for asset in assets]
+        run_load(urls, 1)
+        stats = get_stats(base_url)
+        on_disk = sum(f.stat().st_size for f in Path(cache_dir).iterdir())
+        within = '✓' if on_disk <= stats['cache_max_bytes'] else '✗'
+        print(f"{within} {len(urls)} renditions into a {max_cache_mb}MB cache: "
+              f"{stats['evictions']} evicted, {stats['cache_entries']} kept, "
+              f"{on_disk / (1024 * 1024):.2f}MB on disk")
+
+        # The most recent rendition must still be a hit, the first one evicted
+        _, _, last_cache, _ = fetch(urls[-1])
+        _, _, first_cache, _ = fetch(urls[0])
+        print(f"  most recent: {last_cache}, oldest: {first_cache}")
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    script_dir = Path(__file__).parent
+    assets_dir = script_dir / "attached_assets"
+
+    print("=" * 78)
+    print("Image Service Load Test")
+    print("=" * 78)
+    print()
+
+    load_test(assets_dir, widths=(320, 640, 1024), formats=('jpeg', 'webp'),
+              hit_requests=2000, concurrency=8)
+    print()
+    eviction_test(assets_dir, max_cache_mb=2)
+    print()
+    print("Done!")
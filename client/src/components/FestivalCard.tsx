@@ -1,6 +1,7 @@
 import { Card, CardContent } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { Calendar, MapPin } from "lucide-react";
+import type { ImagePlaceholder } from "@shared/schema";
 
 interface FestivalCardProps {
   name: string;
@@ -9,6 +10,7 @@ interface FestivalCardProps {
   description: string;
   imageSrc?: string;
   highlight?: string;
+  placeholder?: ImagePlaceholder;
 }
 
 export default function FestivalCard({ 
@@ -17,15 +19,24 @@ export default function FestivalCard({
   location, 
   description,
   imageSrc,
-  highlight 
+  highlight,
+  placeholder
 }: FestivalCardProps) {
   return (
     <Card className="overflow-hidden hover-elevate active-elevate-2" data-testid={`card-festival-${name.toLowerCase().replace(/\s+/g, '-')}`}>
       {imageSrc && (
-        <div className="aspect-video w-full overflow-hidden">
+        <div 
+          className="aspect-video w-full overflow-hidden bg-cover bg-center"
+          style={placeholder && {
+            backgroundColor: placeholder.dominantColor,
+            backgroundImage: `url(${placeholder.placeholder})`,
+          }}
+        >
           <img 
             src={imageSrc} 
             alt={name}
+            width={placeholder?.width}
+            height={placeholder?.height}
             className="h-full w-full object-cover"
             loading="lazy"
             decoding="async"
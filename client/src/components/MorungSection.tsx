@@ -6,6 +6,7 @@ import {
   CarouselItem,
   type CarouselApi,
 } from "@/components/ui/carousel";
+import type { ImagePlaceholder, ImagePlaceholders } from "@shared/schema";
 
 interface MorungSectionProps {
   title: string;
@@ -16,7 +17,9 @@ interface MorungSectionProps {
     title: string;
     content: string;
     imageSrc?: string;
+    imagePlaceholders?: ImagePlaceholders;
   }[];
+  imagePlaceholders?: ImagePlaceholders;
 }
 
 // Helper function to format image name to display text
@@ -35,7 +38,14 @@ const formatImageName = (imagePath: string): string => {
   return name;
 };
 
-export default function MorungSection({ title, description, imageSrc, additionalImages = [], sections }: MorungSectionProps) {
+// Blurred preview painted behind an image until it loads. The images are
+// object-contain, so it goes on the img itself rather than a wider wrapper
+const placeholderStyle = (placeholder?: ImagePlaceholder) => placeholder && {
+  backgroundColor: placeholder.dominantColor,
+  backgroundImage: `url(${placeholder.placeholder})`,
+};
+
+export default function MorungSection({ title, description, imageSrc, additionalImages = [], sections, imagePlaceholders }: MorungSectionProps) {
   const [api, setApi] = useState<CarouselApi>();
   const [current, setCurrent] = useState(0);
 
@@ -115,7 +125,10 @@ export default function MorungSection({ title, description, imageSrc, additional
                     <img 
                       src={img} 
                       alt={`${title} - Image ${index + 1}`}
-                      className="max-w-full h-auto object-contain mx-auto"
+                      width={imagePlaceholders?.[allImagePaths[index]]?.width}
+                      height={imagePlaceholders?.[allImagePaths[index]]?.height}
+                      style={placeholderStyle(imagePlaceholders?.[allImagePaths[index]])}
+                      className="max-w-full h-auto object-contain mx-auto bg-cover bg-center"
                       loading={index === 0 ? "eager" : "lazy"}
                       fetchpriority={index === 0 ? "high" : "low"}
                       decoding="async"
@@ -162,7 +175,10 @@ export default function MorungSection({ title, description, imageSrc, additional
             <img 
               src={encodeImageUrl(imageSrc)} 
               alt={title}
-              className="max-w-full h-auto object-contain mx-auto"
+              width={imagePlaceholders?.[imageSrc]?.width}
+              height={imagePlaceholders?.[imageSrc]?.height}
+              style={placeholderStyle(imagePlaceholders?.[imageSrc])}
+              className="max-w-full h-auto object-contain mx-auto bg-cover bg-center"
               loading="eager"
               fetchpriority="high"
               decoding="async"
@@ -200,7 +216,10 @@ export default function MorungSection({ title, description, imageSrc, additional
                     <img 
                       src={encodeImageUrl(section.imageSrc)} 
                       alt={section.title}
-                      className="w-full h-full object-contain md:object-cover"
+                      width={section.imagePlaceholders?.[section.imageSrc]?.width}
+                      height={section.imagePlaceholders?.[section.imageSrc]?.height}
+                      style={placeholderStyle(section.imagePlaceholders?.[section.imageSrc])}
+                      className="w-full h-full object-contain md:object-cover bg-cover bg-center"
                       loading="lazy"
                       decoding="async"
                     />
@@ -1,4 +1,5 @@
 import { MapPin, Mountain, Calendar, ExternalLink } from "lucide-react";
+import type { ImagePlaceholder } from "@shared/schema";
 
 interface VillageCardProps {
   name: string;
@@ -6,6 +7,7 @@ interface VillageCardProps {
   distance: string;
   highlights: string[];
   bestSeason?: string;
+  placeholder?: ImagePlaceholder;
   onClick?: () => void;
 }
 
@@ -34,6 +36,7 @@ export default function VillageCard({
   distance, 
   highlights,
   bestSeason,
+  placeholder,
   onClick 
 }: VillageCardProps) {
   const { km, location, route } = parseDistance(distance);
@@ -46,10 +49,18 @@ export default function VillageCard({
       data-testid={`card-village-${name.toLowerCase()}`}
     >
       {/* Clean image without overlays */}
-      <div className="relative aspect-video w-full overflow-hidden">
+      <div 
+        className="relative aspect-video w-full overflow-hidden bg-cover bg-center"
+        style={placeholder && {
+          backgroundColor: placeholder.dominantColor,
+          backgroundImage: `url(${placeholder.placeholder})`,
+        }}
+      >
         <img 
           src={imageSrc} 
           alt={name}
+          width={placeholder?.width}
+          height={placeholder?.height}
           className="h-full w-full object-cover transition-transform duration-300 group-hover:scale-105"
           loading="lazy"
           decoding="async"
@@ -9,6 +9,7 @@ import {
   CarouselItem,
   type CarouselApi,
 } from "@/components/ui/carousel";
+import type { ImagePlaceholders } from "@shared/schema";
 
 interface VillageDetailProps {
   name: string;
@@ -18,6 +19,7 @@ interface VillageDetailProps {
   attractions: string[];
   bestTime?: string;
   additionalImages?: string[];
+  imagePlaceholders?: ImagePlaceholders;
   onBack?: () => void;
 }
 
@@ -93,6 +95,7 @@ export default function VillageDetail({
   attractions,
   bestTime,
   additionalImages = [],
+  imagePlaceholders,
   onBack
 }: VillageDetailProps) {
   const [api, setApi] = useState<CarouselApi>();
@@ -186,10 +189,18 @@ export default function VillageDetail({
             <CarouselContent>
               {allImages.map((img, index) => (
                 <CarouselItem key={index}>
-                  <div className="aspect-video md:aspect-[21/9] w-full overflow-hidden">
+                  <div
+                    className="aspect-video md:aspect-[21/9] w-full overflow-hidden bg-cover bg-center"
+                    style={imagePlaceholders?.[allImagePaths[index]] && {
+                      backgroundColor: imagePlaceholders[allImagePaths[index]].dominantColor,
+                      backgroundImage: `url(${imagePlaceholders[allImagePaths[index]].placeholder})`,
+                    }}
+                  >
                     <img 
                       src={img} 
                       alt={`${name} - Image ${index + 1}`}
+                      width={imagePlaceholders?.[allImagePaths[index]]?.width}
+                      height={imagePlaceholders?.[allImagePaths[index]]?.height}
                       className="h-full w-full object-cover"
                       loading={index === 0 ? "eager" : "lazy"}
                       fetchpriority={index === 0 ? "high" : "low"}
@@ -233,10 +244,18 @@ export default function VillageDetail({
         </div>
       ) : (
         <div>
-          <div className="aspect-video md:aspect-[21/9] w-full overflow-hidden">
+          <div
+            className="aspect-video md:aspect-[21/9] w-full overflow-hidden bg-cover bg-center"
+            style={imagePlaceholders?.[imageSrc] && {
+              backgroundColor: imagePlaceholders[imageSrc].dominantColor,
+              backgroundImage: `url(${imagePlaceholders[imageSrc].placeholder})`,
+            }}
+          >
             <img 
               src={encodeImageUrl(imageSrc)} 
               alt={name}
+              width={imagePlaceholders?.[imageSrc]?.width}
+              height={imagePlaceholders?.[imageSrc]?.height}
               className="h-full w-full object-cover"
               loading="eager"
               fetchpriority="high"
@@ -41,6 +41,7 @@ export default function Festivals() {
                 description={festival.description}
                 imageSrc={festival.imageSrc}
                 highlight={festival.highlight}
+                placeholder={festival.imageSrc ? festival.imagePlaceholders?.[festival.imageSrc] : undefined}
               />
             ))}
           </div>
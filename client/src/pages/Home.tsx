@@ -100,6 +100,7 @@ export default function Home({ onNavigate, onVillageClick }: HomeProps) {
                   distance={village.distance}
                   highlights={village.highlights}
                   bestSeason={village.bestSeason}
+                  placeholder={village.imagePlaceholders?.[village.imageSrc]}
                   onClick={() => onVillageClick?.(village.id)}
                 />
               ))}
@@ -145,6 +146,7 @@ export default function Home({ onNavigate, onVillageClick }: HomeProps) {
                   description={festival.description}
                   imageSrc={festival.imageSrc}
                   highlight={festival.highlight}
+                  placeholder={festival.imageSrc ? festival.imagePlaceholders?.[festival.imageSrc] : undefined}
                 />
               ))}
             </div>
@@ -37,6 +37,7 @@ export default function Morung() {
         imageSrc={morungData.imageSrc}
         additionalImages={morungData.additionalImages}
         sections={morungData.sections}
+        imagePlaceholders={morungData.imagePlaceholders}
       />
 
       <div className="pt-4">
@@ -57,6 +57,7 @@ export default function Villages({ initialVillageId = null, onVillageDeselect }:
         attractions={selectedVillage.attractions}
         bestTime={selectedVillage.bestSeason}
         additionalImages={selectedVillage.additionalImages}
+        imagePlaceholders={selectedVillage.imagePlaceholders}
         onBack={handleBack}
       />
     );
@@ -93,6 +94,7 @@ export default function Villages({ initialVillageId = null, onVillageDeselect }:
                 distance={village.distance}
                 highlights={village.highlights}
                 bestSeason={village.bestSeason}
+                placeholder={village.imagePlaceholders?.[village.imageSrc]}
                 onClick={() => setSelectedVillage(village)}
               />
             ))}
@@ -9,6 +9,8 @@ from pathlib import Path
 from PIL import Image, ImageOps
 import shutil
 
+from encoder_profiles import prepare_color, save_jpeg
+
 def get_file_size_mb(file_path):
     """Get file size in MB"""
     return os.path.getsize(file_path) / (1024 * 1024)
@@ -17,37 +19,54 @@ def get_file_size_kb(file_path):
     """Get file size in KB"""
     return os.path.getsize(file_path) / 1024
 
-def compress_jpeg(image_path, output_path, quality=85, max_dimension=None):
+def open_image_source(source):
+    """
+    Open a path, PIL Image or RGB NumPy array as a PIL Image
+    Arrays are wrapped without copying where Pillow allows it
+    """
+    if isinstance(source, Image.Image):
+        return source
+    if hasattr(source, '__array_interface__'):
+        return Image.fromarray(source)
+    return Image.open(source)
+
+def describe_source(source):
+    """Get a printable name for a path or in-memory image"""
+    if isinstance(source, (str, Path)):
+        return str(source)
+    return '<in-memory image>'
+
+def compress_jpeg(image_path, output_path, quality=85, max_dimension=None, profile='web'):
     """
     Compress JPEG image while maintaining quality
+    image_path may also be an already decoded PIL Image or RGB NumPy array
+    (e.g. a shared-memory frame from frame_transport)
+    Subsampling, scan mode and metadata come from the encoder profile
     """
     try:
-        img = Image.open(image_path)
+        img = open_image_source(image_path)
+        
+        # Auto-orient based on EXIF data
+        img = ImageOps.exif_transpose(img)
+        
+        # Move to sRGB while the ICC profile still matches the pixels
+        img, icc_profile = prepare_color(img)
         
         # Convert to RGB if necessary
         if img.mode != 'RGB':
             img = img.convert('RGB')
         
-        # Auto-orient based on EXIF data
-        img = ImageOps.exif_transpose(img)
-        
         # Resize if max_dimension is specified and image is larger
         if max_dimension:
             width, height = img.size
             if width > max_dimension or height > max_dimension:
                 img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
         
-        # Save with optimization
-        img.save(
-            output_path,
-            'JPEG',
-            quality=quality,
-            optimize=True,
-            progressive=True
-        )
+        # Save with the encoder profile's per-image settings
+        save_jpeg(img, output_path, profile, quality=quality, icc_profile=icc_profile)
         return True
     except Exception as e:
-        print(f"✗ Error compressing {image_path}: {str(e)}")
+        print(f"✗ Error compressing {describe_source(image_path)}: {str(e)}")
         return False
 
 def compress_png(image_path, output_path, quality=85, max_dimension=None):
@@ -89,13 +108,8 @@ def compress_png(image_path, output_path, quality=85, max_dimension=None):
                     background = Image.new('RGB', img.size, (255, 255, 255))
                     background.paste(img, mask=img.split()[3] if img.mode == 'RGBA' else None)
                     jpeg_path = original_output_path.with_suffix('.jpg')
-                    background.save(
-                        jpeg_path,
-                        'JPEG',
-                        quality=quality,
-                        optimize=True,
-                        progressive=True
-                    )
+                    save_jpeg(background, jpeg_path, quality=quality,
+                              icc_profile=img.info.get('icc_profile'))
                     return True, jpeg_path
             
             # Keep as PNG but use best compression
@@ -141,17 +155,12 @@ def compress_png(image_path, output_path, quality=85, max_dimension=None):
             
             return True, original_output_path
         else:
-            # Convert to RGB and save as JPEG for better compression
+            # Convert to sRGB and save as JPEG for better compression
+            img, icc_profile = prepare_color(img)
             if img.mode != 'RGB':
                 img = img.convert('RGB')
             jpeg_path = original_output_path.with_suffix('.jpg')
-            img.save(
-                jpeg_path,
-                'JPEG',
-                quality=quality,
-                optimize=True,
-                progressive=True
-            )
+            save_jpeg(img, jpeg_path, quality=quality, icc_profile=icc_profile)
             return True, jpeg_path
     except Exception as e:
         print(f"✗ Error compressing {image_path}: {str(e)}")
@@ -261,9 +270,10 @@ def compress_image(image_path, output_path=None, quality=85, max_dimension=2048,
     
     return False
 
-def compress_images_in_directory(directory_path, quality=85, max_dimension=2048, create_backup=True, min_size_mb=1.0):
+def compress_images_in_directory(directory_path, quality=85, max_dimension=2048, create_backup=True, min_size_mb=1.0, update_placeholders=True):
     """
     Compress all images in a directory that are larger than min_size_mb
+    If update_placeholders is True, the placeholder index is refreshed afterwards
     """
     directory = Path(directory_path)
     if not directory.exists():
@@ -350,6 +360,12 @@ def compress_images_in_directory(directory_path, quality=85, max_dimension=2048,
     if create_backup and backup_dir:
         print(f"\n✓ Backups saved in: {backup_dir}")
         print("You can delete the backup directory after verifying the compressed images")
+    
+    if update_placeholders:
+        # Dimensions and placeholders change when images are resized
+        from image_placeholders import build_placeholder_index
+        print()
+        build_placeholder_index(directory)
 
 if __name__ == "__main__":
     # Get the directory of this script
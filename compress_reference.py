@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Reference Compression Implementations
+Frozen copies of the original compression code from compress_images.py,
+kept as the baseline for output comparisons
+"""
+
+from pathlib import Path
+from PIL import Image, ImageOps
+
+def compress_jpeg_reference(image_path, output_path, quality=85, max_dimension=None):
+    """
+    Compress JPEG image while maintaining quality
+    """
+    try:
+        img = Image.open(image_path)
+        
+        # Convert to RGB if necessary
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        # Auto-orient based on EXIF data
+        img = ImageOps.exif_transpose(img)
+        
+        # Resize if max_dimension is specified and image is larger
+        if max_dimension:
+            width, height = img.size
+            if width > max_dimension or height > max_dimension:
+                img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        
+        # Save with optimization
+        img.save(
+            output_path,
+            'JPEG',
+            quality=quality,
+            optimize=True,
+            progressive=True
+        )
+        return True
+    except Exception as e:
+        print(f"✗ Error compressing {image_path}: {str(e)}")
+        return False
+
+def compress_png_reference(image_path, output_path, quality=85, max_dimension=None):
+    """
+    Compress PNG image - converts to JPEG for better compression
+    or optimizes PNG if transparency is needed
+    """
+    try:
+        img = Image.open(image_path)
+        original_output_path = Path(output_path)
+        
+        # Auto-orient based on EXIF data
+        img = ImageOps.exif_transpose(img)
+        
+        # Check if image has transparency
+        has_transparency = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+        
+        # Resize if max_dimension is specified and image is larger
+        if max_dimension:
+            width, height = img.size
+            if width > max_dimension or height > max_dimension:
+                img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        
+        if has_transparency:
+            # Check if transparency is actually being used
+            # If most pixels are opaque, we can flatten to white background and use JPEG
+            if img.mode == 'RGBA':
+                # Sample pixels to check transparency usage (check every Nth pixel for speed)
+                alpha = img.split()[3]
+                pixels = list(alpha.getdata())
+                step = max(1, len(pixels) // 10000)  # Sample up to 10000 pixels
+                transparent_count = sum(1 for i in range(0, len(pixels), step) if pixels[i] < 255)
+                total_sampled = len(range(0, len(pixels), step))
+                transparency_ratio = transparent_count / total_sampled if total_sampled > 0 else 0
+                
+                # If less than 5% of pixels are transparent, flatten to white and use JPEG
+                if transparency_ratio < 0.05:
+                    # Flatten to white background
+                    background = Image.new('RGB', img.size, (255, 255, 255))
+                    background.paste(img, mask=img.split()[3] if img.mode == 'RGBA' else None)
+                    jpeg_path = original_output_path.with_suffix('.jpg')
+                    background.save(
+                        jpeg_path,
+                        'JPEG',
+                        quality=quality,
+                        optimize=True,
+                        progressive=True
+                    )
+                    return True, jpeg_path
+            
+            # Keep as PNG but use best compression
+            # Try multiple compression strategies and use the smallest
+            from io import BytesIO
+            best_size = float('inf')
+            best_buffer = None
+            
+            # Strategy 1: Standard RGBA compression
+            try:
+                buffer = BytesIO()
+                img.save(buffer, 'PNG', optimize=True, compress_level=9)
+                size = len(buffer.getvalue())
+                if size < best_size:
+                    best_size = size
+                    best_buffer = buffer
+            except:
+                pass
+            
+            # Strategy 2: Try quantizing colors if it's RGBA (works well for images with limited colors)
+            if img.mode == 'RGBA':
+                try:
+                    buffer = BytesIO()
+                    # Quantize to reduce color palette while preserving transparency
+                    img_q = img.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+                    # Convert back to RGBA to preserve transparency
+                    img_q = img_q.convert('RGBA')
+                    img_q.save(buffer, 'PNG', optimize=True, compress_level=9)
+                    size = len(buffer.getvalue())
+                    if size < best_size:
+                        best_size = size
+                        best_buffer = buffer
+                except:
+                    pass
+            
+            # Save the best result
+            if best_buffer:
+                with open(output_path, 'wb') as f:
+                    f.write(best_buffer.getvalue())
+            else:
+                # Fallback
+                img.save(output_path, 'PNG', optimize=True, compress_level=9)
+            
+            return True, original_output_path
+        else:
+            # Convert to RGB and save as JPEG for better compression
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            jpeg_path = original_output_path.with_suffix('.jpg')
+            img.save(
+                jpeg_path,
+                'JPEG',
+                quality=quality,
+                optimize=True,
+                progressive=True
+            )
+            return True, jpeg_path
+    except Exception as e:
+        print(f"✗ Error compressing {image_path}: {str(e)}")
+        return False, None
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+JPEG Encoder Profiles
+Picks chroma subsampling and progressive vs baseline scans per image by
+bytes per unit of perceptual quality, and strips metadata the site never
+uses (EXIF, thumbnails, camera ICC profiles) while keeping colors in sRGB
+"""
+
+from io import BytesIO
+from pathlib import Path
+from PIL import Image, ImageOps
+import numpy as np
+
+from image_metrics import ssim
+
+try:
+    from PIL import ImageCms
+    IMAGECMS_AVAILABLE = True
+except ImportError:
+    IMAGECMS_AVAILABLE = False
+
+# Pillow's subsampling values
+SUBSAMPLING_MODES = {'4:4:4': 0, '4:2:2': 1, '4:2:0': 2}
+# Cheapest first: each step up keeps more chroma detail and costs bytes
+SUBSAMPLING_ORDER = ['4:2:0', '4:2:2', '4:4:4']
+
+# One perceptual quality unit is 0.001 of color-weighted SSIM. Finer chroma
+# subsampling is chosen only if each unit it buys costs at most
+# max_size_increase_per_unit of the 4:2:0 file size, and the file stays
+# within max_size_ratio of the 4:2:0 size (None for no cap). On the site's
+# photos 4:2:2 costs 3-11% and 4:4:4 7-29% for at most a few units.
+ENCODER_PROFILES = {
+    # Final delivery files written by compress_images.py: size first, finer
+    # chroma only for a large gain at a small cost
+    'web': {'quality': 85, 'subsampling': 'auto', 'progressive': 'auto',
+            'max_size_increase_per_unit': 0.01, 'max_size_ratio': 1.05},
+    # Enhancer outputs, which are compressed again for delivery later on.
+    # Quality 92 with optimized Huffman tables is visually lossless for
+    # that purpose at a fraction of the size of quality 98 / 4:4:4.
+    'master': {'quality': 92, 'subsampling': 'auto', 'progressive': 'auto',
+               'max_size_increase_per_unit': 0.05, 'max_size_ratio': None},
+}
+QUALITY_UNIT = 0.001
+
+# Weights of the Y, Cb and Cr planes in the quality score
+CHANNEL_WEIGHTS = (0.8, 0.1, 0.1)
+
+# Quality is scored on a center crop of at most this size
+SCORE_CROP_SIZE = 512
+
+def center_crop(img, size=SCORE_CROP_SIZE):
+    """
+    Crop the central size x size region (or less, for small images),
+    aligned to 16px so its JPEG blocks match the full image's
+    """
+    width, height = img.size
+    crop_w, crop_h = min(width, size), min(height, size)
+    left, top = (width - crop_w) // 2 // 16 * 16, (height - crop_h) // 2 // 16 * 16
+    return img.crop((left, top, left + crop_w, top + crop_h))
+
+def quality_score(reference, candidate):
+    """
+    Color-weighted SSIM of two RGB images: mostly luma, with the chroma
+    planes included so that subsampling losses show up
+    """
+    ref = np.asarray(reference.convert('YCbCr'))
+    cand = np.asarray(candidate.convert('YCbCr'))
+    return sum(weight * ssim(ref[..., c], cand[..., c])
+               for c, weight in enumerate(CHANNEL_WEIGHTS))
+
+def read_icc_profile(image_path):
+    """Get the embedded ICC profile of an image file, if any"""
+    try:
+        with Image.open(image_path) as img:
+            return img.info.get('icc_profile')
+    except Exception:
+        return None
+
+# ICC color space signature (header bytes 16-20) each image mode needs
+PROFILE_COLOR_SPACES = {'RGB': b'RGB ', 'RGBA': b'RGB ', 'CMYK': b'CMYK', 'L': b'GRAY', 'LAB': b'Lab '}
+
+def profile_color_space(icc_profile):
+    """Color space signature from an ICC profile's header"""
+    return bytes(icc_profile[16:20])
+
+def prepare_color(img, icc_profile=None):
+    """
+    Bring an image into sRGB and choose the ICC profile to embed
+
+    Returns (image, profile bytes or None). Images without a profile are
+    already treated as sRGB by browsers and get none. An sRGB profile is
+    replaced by Pillow's compact built-in one; any other profile (e.g.
+    Adobe RGB from a camera, or a CMYK press profile) is converted to sRGB
+    so the pixels still look the same once it is gone. Call this before
+    converting the image to RGB: a profile that doesn't describe the
+    pixels' color space, or can't be applied, is dropped rather than
+    embedded in an output it no longer matches.
+    """
+    if icc_profile is None:
+        icc_profile = img.info.get('icc_profile')
+    if not icc_profile:
+        return img, None
+    if img.mode == 'P':
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    if PROFILE_COLOR_SPACES.get(img.mode) != profile_color_space(icc_profile):
+        return img, None
+    if not IMAGECMS_AVAILABLE:
+        # Can't convert it - keep the original to stay color-correct
+        return img, icc_profile
+    try:
+        source = ImageCms.ImageCmsProfile(BytesIO(icc_profile))
+        srgb = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB'))
+        is_srgb = 'srgb' in ImageCms.getProfileDescription(source).lower()
+        if not (is_srgb and img.mode in ('RGB', 'RGBA')):
+            output_mode = 'RGBA' if img.mode == 'RGBA' else 'RGB'
+            img = ImageCms.profileToProfile(img, source, srgb, outputMode=output_mode)
+        return img, srgb.tobytes()
+    except Exception:
+        return img, None
+
+def encode_jpeg(img, quality, subsampling='4:2:0', progressive=True, icc_profile=None):
+    """
+    Encode an RGB image as JPEG bytes with optimized Huffman tables
+    Nothing but the given ICC profile is written as metadata
+    """
+    options = {'quality': quality, 'optimize': True, 'progressive': progressive,
+               'subsampling': SUBSAMPLING_MODES[subsampling]}
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    buffer = BytesIO()
+    try:
+        img.save(buffer, 'JPEG', **options)
+    except OSError:
+        # Pillow sizes the optimize/progressive buffer at one byte per pixel;
+        # noisy content at high quality can overflow it. Plain baseline
+        # output streams, so it has no such limit.
+        options.update(optimize=False, progressive=False)
+        buffer = BytesIO()
+        img.save(buffer, 'JPEG', **options)
+    return buffer.getvalue()
+
+def encode_baseline(img, baseline, icc_profile=None):
+    """
+    Encode with the save() options a caller used before encoder profiles,
+    to measure what the profile saves. The same ICC profile is embedded
+    as in the profile's output, so the sizes compare like for like.
+    """
+    options = dict(baseline)
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    buffer = BytesIO()
+    img.save(buffer, 'JPEG', **options)
+    return len(buffer.getvalue())
+
+def choose_subsampling(img, quality, progressive, icc_profile,
+                       max_size_increase_per_unit, max_size_ratio=None):
+    """
+    Try each subsampling mode and keep finer chroma only when it pays off
+
+    Starting from 4:2:0, a finer mode replaces the current choice if it
+    improves the quality score, each quality unit gained costs at most
+    max_size_increase_per_unit of the 4:2:0 size, and the result stays
+    within max_size_ratio of the 4:2:0 size. Modes are compared on the
+    scoring crop, so only the chosen mode is encoded at full size.
+    Returns (mode, data, score).
+    """
+    reference = center_crop(img)
+    whole = reference.size == img.size
+    best = None
+    for mode in SUBSAMPLING_ORDER:
+        # The ICC profile is a constant overhead, left out of crop trials
+        data = encode_jpeg(reference, quality, mode, progressive, icc_profile if whole else None)
+        if best is None:
+            score = quality_score(reference, Image.open(BytesIO(data)).convert('RGB'))
+            best = (mode, data, score)
+            base_bytes = len(data)
+            continue
+        if max_size_ratio and len(data) > base_bytes * max_size_ratio:
+            # Finer modes only get bigger
+            break
+        score = quality_score(reference, Image.open(BytesIO(data)).convert('RGB'))
+        gained_units = (score - best[2]) / QUALITY_UNIT
+        extra_bytes = len(data) - len(best[1])
+        if gained_units > 0 and extra_bytes / gained_units <= base_bytes * max_size_increase_per_unit:
+            best = (mode, data, score)
+    mode, data, score = best
+    if not whole:
+        data = encode_jpeg(img, quality, mode, progressive, icc_profile)
+    return mode, data, score
+
+def encode_with_profile(img, profile='web', quality=None, icc_profile=None, baseline=None,
+                        measure_baseline=True):
+    """
+    Encode an image with an encoder profile
+
+    icc_profile overrides the profile found in img.info (for pixels decoded
+    by OpenCV, which drops it). baseline is the dict of save() options the
+    caller used before, used only to report savings; measure_baseline=False
+    skips that extra encode. Returns (data, report).
+    """
+    settings = ENCODER_PROFILES[profile]
+    quality = quality or settings['quality']
+    source_info = dict(img.info)
+    if icc_profile is not None:
+        source_info['icc_profile'] = icc_profile
+
+    # Orientation is stripped with the rest of EXIF, so it must be applied
+    img = ImageOps.exif_transpose(img)
+    img, embed_profile = prepare_color(img, source_info.get('icc_profile'))
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    progressive = settings['progressive']
+    search_progressive = progressive == 'auto'
+    if search_progressive:
+        # Subsampling is chosen on baseline scans; the scan mode doesn't
+        # change the decoded pixels, only the size
+        progressive = False
+
+    if settings['subsampling'] == 'auto':
+        subsampling, data, score = choose_subsampling(
+            img, quality, progressive, embed_profile,
+            settings['max_size_increase_per_unit'], settings['max_size_ratio'])
+    else:
+        subsampling = settings['subsampling']
+        data = encode_jpeg(img, quality, subsampling, progressive, embed_profile)
+        score = None
+
+    if search_progressive:
+        progressive_data = encode_jpeg(img, quality, subsampling, True, embed_profile)
+        if len(progressive_data) < len(data):
+            data, progressive = progressive_data, True
+
+    if baseline is None:
+        baseline = {'quality': quality, 'optimize': True, 'progressive': True}
+    original_metadata = sum(len(source_info.get(key) or b'') for key in ('exif', 'icc_profile'))
+    report = {
+        'profile': profile,
+        'quality': quality,
+        'subsampling': subsampling,
+        'progressive': progressive,
+        'score': score,
+        'bytes': len(data),
+        'baseline_bytes': encode_baseline(img, baseline, embed_profile) if measure_baseline else None,
+        'metadata_removed': max(0, original_metadata - len(embed_profile or b'')),
+    }
+    return data, report
+
+def save_jpeg(img, output_path, profile='web', quality=None, icc_profile=None, baseline=None):
+    """
+    Save an image as JPEG with an encoder profile and print the savings
+    Returns the report from encode_with_profile
+    """
+    data, report = encode_with_profile(img, profile, quality=quality,
+                                       icc_profile=icc_profile, baseline=baseline)
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    print(f"  encoded {Path(output_path).name}: {format_report(report)}")
+    return report
+
+def save_array_jpeg(img_rgb, output_path, profile='master', source_path=None, baseline=None):
+    """
+    Save an RGB NumPy array with an encoder profile, carrying over the
+    source file's ICC profile (lost when the pixels were decoded by OpenCV)
+    """
+    icc_profile = read_icc_profile(source_path) if source_path else None
+    return save_jpeg(Image.fromarray(img_rgb), output_path, profile,
+                     icc_profile=icc_profile, baseline=baseline)
+
+def is_jpeg_path(path):
+    """Check whether a path has a JPEG extension"""
+    return Path(path).suffix.lower() in ('.jpg', '.jpeg')
+
+def format_report(report):
+    """One-line summary of an encoder report"""
+    scans = 'progressive' if report['progressive'] else 'baseline'
+    if report['baseline_bytes'] is None:
+        return f"q{report['quality']} {report['subsampling']} {scans}, {report['bytes'] / 1024:.1f}KB"
+    change = report['bytes'] - report['baseline_bytes']
+    percent = change / report['baseline_bytes'] * 100 if report['baseline_bytes'] else 0
+    text = (f"q{report['quality']} {report['subsampling']} {scans}, "
+            f"{report['baseline_bytes'] / 1024:.1f}KB → {report['bytes'] / 1024:.1f}KB "
+            f"({percent:+.1f}% vs previous settings)")
+    if report['metadata_removed']:
+        text += f", {report['metadata_removed'] / 1024:.1f}KB source metadata dropped"
+    return text
+
+if __name__ == "__main__":
+    script_dir = Path(__file__).parent
+    assets_dir = script_dir / "attached_assets"
+
+    print("=" * 70)
+    print("JPEG Encoder Profiles - Dry Run")
+    print("=" * 70)
+    print(f"Analyzing images in: {assets_dir}")
+    print("-" * 70)
+
+    image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+    image_files = sorted(f for f in assets_dir.iterdir()
+                         if f.suffix in image_extensions and f.is_file())
+
+    total_bytes = 0
+    total_baseline = 0
+    for image_file in image_files:
+        try:
+            img = Image.open(image_file)
+            img.thumbnail((2048, 2048), Image.Resampling.LANCZOS)
+            _, report = encode_with_profile(img, 'web')
+        except Exception as e:
+            print(f"✗ {image_file.name}: {str(e)}")
+            continue
+        total_bytes += report['bytes']
+        total_baseline += report['baseline_bytes']
+        print(f"✓ {image_file.name[:40]:<40} {format_report(report)}")
+
+    print("-" * 70)
+    if total_baseline:
+        print(f"Total: {total_baseline / (1024 * 1024):.2f}MB → {total_bytes / (1024 * 1024):.2f}MB "
+              f"({(total_bytes - total_baseline) / total_baseline * 100:+.1f}% vs previous settings)")
@@ -6,7 +6,9 @@ Enhances images using PIL/Pillow and OpenCV for realistic beautification
 
 import os
 from pathlib import Path
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+
+from encoder_profiles import is_jpeg_path, prepare_color, save_array_jpeg, save_jpeg
 
 # Try to import OpenCV, but continue without it if not available
 try:
@@ -21,8 +23,11 @@ def enhance_image_pil(image_path, output_path, enhancement_factor=1.2):
     Enhance image using PIL/Pillow for realistic improvements
     """
     try:
-        # Open image
-        img = Image.open(image_path)
+        # Open image (EXIF orientation is applied here, since the encoder
+        # profile strips EXIF from the output), then move it to sRGB while
+        # the ICC profile still matches the pixels
+        img = ImageOps.exif_transpose(Image.open(image_path))
+        img, icc_profile = prepare_color(img)
         
         # Convert to RGB if necessary
         if img.mode != 'RGB':
@@ -45,7 +50,11 @@ def enhance_image_pil(image_path, output_path, enhancement_factor=1.2):
         img = enhancer.enhance(1.2)
         
         # Save enhanced image
-        img.save(output_path, quality=95, optimize=True)
+        if is_jpeg_path(output_path):
+            save_jpeg(img, output_path, 'master', icc_profile=icc_profile,
+                      baseline={'quality': 95, 'optimize': True})
+        else:
+            img.save(output_path, quality=95, optimize=True)
         print(f"✓ Enhanced: {os.path.basename(image_path)}")
         return True
     except Exception as e:
@@ -82,16 +91,21 @@ def enhance_image_opencv(image_path, output_path):
         img = cv2.addWeighted(img, 1.5, gaussian, -0.5, 0)
         
         # Save enhanced image
-        cv2.imwrite(str(output_path), img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        if is_jpeg_path(output_path):
+            save_array_jpeg(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), output_path, 'master',
+                            source_path=image_path, baseline={'quality': 95})
+        else:
+            cv2.imwrite(str(output_path), img, [cv2.IMWRITE_JPEG_QUALITY, 95])
         print(f"✓ Enhanced (OpenCV): {os.path.basename(image_path)}")
         return True
     except Exception as e:
         print(f"✗ Error enhancing {image_path} with OpenCV: {str(e)}")
         return False
 
-def enhance_images_in_directory(directory_path, use_opencv=True):
+def enhance_images_in_directory(directory_path, use_opencv=True, parallel=False):
     """
     Enhance all images in a directory
+    If parallel is True, images are spread across processes by image_scheduler
     """
     directory = Path(directory_path)
     if not directory.exists():
@@ -117,16 +131,23 @@ def enhance_images_in_directory(directory_path, use_opencv=True):
     print("-" * 50)
     
     success_count = 0
-    for image_file in image_files:
-        output_path = enhanced_dir / image_file.name
-        
-        if use_opencv:
-            success = enhance_image_opencv(image_file, output_path)
-        else:
-            success = enhance_image_pil(image_file, output_path)
-        
-        if success:
-            success_count += 1
+    if parallel:
+        # Balance worker processes, OpenCV threads and memory per image
+        from image_scheduler import run_jobs
+        enhance_func = enhance_image_opencv if use_opencv else enhance_image_pil
+        jobs = [(image_file, enhanced_dir / image_file.name) for image_file in image_files]
+        success_count, _ = run_jobs(enhance_func, jobs)
+    else:
+        for image_file in image_files:
+            output_path = enhanced_dir / image_file.name
+            
+            if use_opencv:
+                success = enhance_image_opencv(image_file, output_path)
+            else:
+                success = enhance_image_pil(image_file, output_path)
+            
+            if success:
+                success_count += 1
     
     print("-" * 50)
     print(f"Enhancement complete: {success_count}/{len(image_files)} images enhanced")
@@ -4,11 +4,15 @@ Advanced AI Image Enhancement Script
 Enhances images to look very scenic, bright, and HD using advanced AI techniques
 """
 
+import json
 import os
+from functools import lru_cache
 from pathlib import Path
 from PIL import Image, ImageEnhance, ImageFilter, ImageOps, ImageDraw
 import numpy as np
 
+from encoder_profiles import is_jpeg_path, prepare_color, save_array_jpeg, save_jpeg
+
 # Try to import OpenCV for advanced processing
 try:
     import cv2
@@ -34,11 +38,10 @@ def create_smooth_shading_mask(height, width, center_focus=True):
         mask = 1 - (y / height) * 0.2  # 20% darker at bottom
     return np.clip(mask, 0.7, 1.0)
 
-def apply_vignette_effect(img_array, strength=0.15):
+def create_vignette_mask(height, width, strength=0.15):
     """
-    Apply smooth vignette effect for artistic look
+    Create the radial vignette mask (1.0 = unchanged)
     """
-    height, width = img_array.shape[:2]
     y, x = np.ogrid[:height, :width]
     center_x, center_y = width // 2, height // 2
     
@@ -46,7 +49,14 @@ def apply_vignette_effect(img_array, strength=0.15):
     mask = np.sqrt((x - center_x)**2 + (y - center_y)**2)
     max_dist = np.sqrt(center_x**2 + center_y**2)
     vignette = 1 - (mask / max_dist) * strength
-    vignette = np.clip(vignette, 0.85, 1.0)
+    return np.clip(vignette, 0.85, 1.0)
+
+def apply_vignette_effect(img_array, strength=0.15):
+    """
+    Apply smooth vignette effect for artistic look
+    """
+    height, width = img_array.shape[:2]
+    vignette = create_vignette_mask(height, width, strength)
     
     # Apply vignette to each channel
     if len(img_array.shape) == 3:
@@ -54,22 +64,401 @@ def apply_vignette_effect(img_array, strength=0.15):
     
     return (img_array * vignette).astype(np.uint8)
 
-def apply_glow_effect(img_array, intensity=0.1):
+def apply_glow_effect(img_array, intensity=0.1, sigma=15):
     """
     Apply subtle glow effect for dreamy look
     """
     if OPENCV_AVAILABLE:
         # Create soft glow using Gaussian blur
-        blurred = cv2.GaussianBlur(img_array, (0, 0), 15)
+        blurred = cv2.GaussianBlur(img_array, (0, 0), sigma)
         # Blend original with blurred version
         glowed = cv2.addWeighted(img_array, 1 - intensity, blurred, intensity, 0)
         return glowed
     return img_array
 
-def enhance_image_advanced(image_path, output_path):
+# Stage settings used when no analysis is done (the original fixed pipeline).
+# A value of None (or a gain of 1.0) means the stage is skipped.
+# glow_sigma is in pixels of the image being processed.
+DEFAULT_ENHANCEMENT_PLAN = {
+    'clahe_clip': 3.0,
+    'denoise_h': 5,
+    'saturation': 1.25,
+    'value': 1.15,
+    'sharpen_amount': 0.8,
+    'glow_intensity': 0.08,
+    'glow_sigma': 15,
+    'vignette_strength': 0.12,
+}
+
+# Tuned settings written by enhancement_sweep.py, used as the base plan
+# when present next to this script
+TUNED_PLAN_FILENAME = 'enhancement_plan.json'
+
+def load_enhancement_plan(plan_path):
+    """
+    Load a plan saved as JSON on top of the defaults
+    Returns None if the file doesn't exist
+    """
+    plan_path = Path(plan_path)
+    if not plan_path.exists():
+        return None
+    with open(plan_path, 'r', encoding='utf-8') as f:
+        values = json.load(f)
+    unknown = set(values) - set(DEFAULT_ENHANCEMENT_PLAN)
+    if unknown:
+        raise ValueError(f"Unknown enhancement settings in {plan_path}: {', '.join(sorted(unknown))}")
+    return dict(DEFAULT_ENHANCEMENT_PLAN, **values)
+
+@lru_cache(maxsize=1)
+def tuned_enhancement_plan():
+    """
+    The plan enhancement_sweep.py saved next to this script, or the defaults
+    if no sweep has been run. Read once per process; file-level entry points
+    use it when no plan is given.
+    """
+    return (load_enhancement_plan(Path(__file__).parent / TUNED_PLAN_FILENAME)
+            or DEFAULT_ENHANCEMENT_PLAN)
+
+# Longest side of the proxy used for image statistics
+ANALYSIS_PROXY_SIZE = 256
+
+def estimate_noise_sigma(gray):
+    """
+    Estimate Gaussian noise sigma of a grayscale image (Immerkaer's method),
+    using only the flatter half of the image so texture isn't counted as noise
+    """
+    gray = gray.astype(np.float32)
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    response = np.abs(cv2.filter2D(gray, -1, kernel)[1:-1, 1:-1])
+    gradient = (np.abs(cv2.Sobel(gray, cv2.CV_32F, 1, 0)) +
+                np.abs(cv2.Sobel(gray, cv2.CV_32F, 0, 1)))[1:-1, 1:-1]
+    flat = gradient <= np.median(gradient)
+    return float(np.sqrt(np.pi / 2) * response[flat].mean() / 6)
+
+def analyze_image_stats(img_bgr):
+    """
+    Compute cheap statistics used to pick enhancement stages
+
+    Tonal and color statistics come from a small downsampled proxy. Noise
+    and sharpness are measured on a full-resolution center crop, because
+    downsampling averages noise away and makes soft images look sharp.
+    """
+    height, width = img_bgr.shape[:2]
+    scale = min(1.0, ANALYSIS_PROXY_SIZE / max(height, width))
+    proxy = cv2.resize(img_bgr, (max(1, int(width * scale)), max(1, int(height * scale))),
+                       interpolation=cv2.INTER_AREA)
+
+    l_channel = cv2.cvtColor(proxy, cv2.COLOR_BGR2LAB)[:, :, 0]
+    low, high = np.percentile(l_channel, [2, 98])
+    hsv = cv2.cvtColor(proxy, cv2.COLOR_BGR2HSV)
+
+    crop = min(ANALYSIS_PROXY_SIZE, height, width)
+    top, left = (height - crop) // 2, (width - crop) // 2
+    crop_gray = cv2.cvtColor(img_bgr[top:top + crop, left:left + crop], cv2.COLOR_BGR2GRAY)
+
+    return {
+        'spread': float(high - low),
+        'mean_saturation': float(hsv[:, :, 1].mean()),
+        'mean_value': float(hsv[:, :, 2].mean()),
+        'noise_sigma': estimate_noise_sigma(crop_gray) if crop >= 3 else 0.0,
+        'sharpness': float(cv2.Laplacian(crop_gray, cv2.CV_64F).var()),
+    }
+
+def choose_enhancement_plan(stats, base_plan=None):
+    """
+    Pick stage strengths from image statistics: already contrasty, bright,
+    saturated, clean or sharp images get weaker stages or skip them
+    Strengths are scaled from base_plan (the defaults unless given)
+    """
+    base = dict(DEFAULT_ENHANCEMENT_PLAN, **(base_plan or {}))
+    plan = dict(base)
+
+    # Contrast: full CLAHE for flat images, gentler for wide histograms
+    if stats['spread'] >= 220:
+        plan['clahe_clip'] = None
+    elif stats['spread'] >= 160 and base['clahe_clip']:
+        plan['clahe_clip'] = round(base['clahe_clip'] * 2 / 3, 3)
+
+    # Color: scale the gains down as the image approaches the target look
+    saturation_need = np.clip((140 - stats['mean_saturation']) / 60, 0, 1)
+    plan['saturation'] = round(1 + (base['saturation'] - 1) * float(saturation_need), 3)
+    value_need = np.clip((170 - stats['mean_value']) / 50, 0, 1)
+    plan['value'] = round(1 + (base['value'] - 1) * float(value_need), 3)
+
+    # Noise: skip NL-means on clean images, match its strength to the noise
+    if stats['noise_sigma'] < 1.5 or not base['denoise_h']:
+        plan['denoise_h'] = None
+    else:
+        plan['denoise_h'] = int(min(7, max(3, round(stats['noise_sigma'] * 1.5))))
+
+    # Sharpness: Laplacian variance of the full-resolution crop
+    if stats['sharpness'] >= 3000:
+        plan['sharpen_amount'] = None
+    elif stats['sharpness'] >= 1200 and base['sharpen_amount']:
+        plan['sharpen_amount'] = round(base['sharpen_amount'] / 2, 3)
+
+    return plan
+
+def describe_plan(plan):
+    """One-line summary of applied and skipped stages for logging"""
+    applied = []
+    skipped = []
+    if plan['clahe_clip']:
+        applied.append(f"clahe({plan['clahe_clip']})")
+    else:
+        skipped.append('clahe')
+    if plan['denoise_h']:
+        applied.append(f"denoise(h={plan['denoise_h']})")
+    else:
+        skipped.append('denoise')
+    if plan['saturation'] != 1 or plan['value'] != 1:
+        applied.append(f"hsv(s×{plan['saturation']}, v×{plan['value']})")
+    else:
+        skipped.append('hsv')
+    if plan['sharpen_amount']:
+        applied.append(f"sharpen({plan['sharpen_amount']})")
+    else:
+        skipped.append('sharpen')
+    summary = ' '.join(applied) or 'effects only'
+    if skipped:
+        summary += f" | skipped: {', '.join(skipped)}"
+    return summary
+
+def apply_tonal_stages(img_bgr, plan):
+    """
+    CLAHE contrast and NL-means denoising (per image, not pointwise)
+    Returns a BGR uint8 image
+    """
+    if plan['clahe_clip']:
+        # Convert to LAB color space for better color manipulation
+        lab = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.split(lab)
+        
+        # Advanced CLAHE for brightness and contrast with smooth transitions
+        clahe = cv2.createCLAHE(clipLimit=plan['clahe_clip'], tileGridSize=(8, 8))
+        l_enhanced = clahe.apply(l)
+        
+        # Merge LAB channels
+        lab_enhanced = cv2.merge([l_enhanced, a, b])
+        img_bgr = cv2.cvtColor(lab_enhanced, cv2.COLOR_LAB2BGR)
+    
+    if plan['denoise_h']:
+        # Advanced denoising while preserving details
+        img_bgr = cv2.fastNlMeansDenoisingColored(
+            img_bgr, None, plan['denoise_h'], plan['denoise_h'], 7, 21
+        )
+    return img_bgr
+
+def apply_glow_and_sharpen(img_rgb, plan):
+    """
+    Glow blend and unsharp mask on an RGB uint8 image (per image, not pointwise)
+    """
+    # Apply subtle glow effect
+    img_rgb = apply_glow_effect(img_rgb, intensity=plan['glow_intensity'], sigma=plan['glow_sigma'])
+    
+    if plan['sharpen_amount']:
+        # Advanced sharpening using unsharp mask
+        amount = plan['sharpen_amount']
+        gaussian = cv2.GaussianBlur(img_rgb, (0, 0), 1.5)
+        img_rgb = cv2.addWeighted(img_rgb, 1 + amount, gaussian, -amount, 0)
+    return img_rgb
+
+def enhance_array_advanced(img_bgr, plan=None):
+    """
+    Run the OpenCV enhancement stages on a decoded BGR image
+    Returns the enhanced image as an RGB uint8 array
+
+    plan selects and tunes the stages (see choose_enhancement_plan);
+    by default every stage runs at its original strength.
+    """
+    if plan is None:
+        plan = DEFAULT_ENHANCEMENT_PLAN
+    return apply_finishing_stages(apply_tonal_stages(img_bgr, plan), plan)
+
+def apply_finishing_stages(img_enhanced, plan):
+    """
+    Shading, color gains, glow, sharpening and vignette on a BGR image
+    that has been through apply_tonal_stages. Returns RGB uint8.
+    """
+    height, width = img_enhanced.shape[:2]
+    
+    # Convert to RGB for further processing
+    img_rgb = cv2.cvtColor(img_enhanced, cv2.COLOR_BGR2RGB).astype(np.float32)
+    
+    # Smooth shading - apply radial gradient for depth
+    shading_mask = create_smooth_shading_mask(height, width, center_focus=True)
+    img_rgb = img_rgb * shading_mask[:, :, np.newaxis]
+    img_rgb = np.clip(img_rgb, 0, 255)
+    
+    if plan['saturation'] != 1 or plan['value'] != 1:
+        # Enhance saturation for scenic look
+        img_rgb_uint8 = img_rgb.astype(np.uint8)
+        hsv = cv2.cvtColor(img_rgb_uint8, cv2.COLOR_RGB2HSV).astype(np.float32)
+        h, s, v = cv2.split(hsv)
+        
+        # Increase saturation (25% by default) for vibrant scenic look
+        s = s * plan['saturation']
+        s = np.clip(s, 0, 255)
+        # Slightly increase brightness
+        v = v * plan['value']
+        v = np.clip(v, 0, 255)
+        hsv_enhanced = cv2.merge([h, s, v]).astype(np.uint8)
+        img_rgb = cv2.cvtColor(hsv_enhanced, cv2.COLOR_HSV2RGB).astype(np.float32)
+    
+    img_rgb = apply_glow_and_sharpen(img_rgb.astype(np.uint8), plan)
+    
+    # Apply smooth vignette effect
+    img_rgb = apply_vignette_effect(img_rgb, strength=plan['vignette_strength'])
+    
+    # Final smooth shading overlay for depth
+    final_shading = create_smooth_shading_mask(height, width, center_focus=True)
+    img_rgb = (img_rgb.astype(np.float32) * final_shading[:, :, np.newaxis]).astype(np.uint8)
+    
+    return img_rgb
+
+def gain_lut(gain):
+    """
+    256-entry table for an 8-bit channel multiplied by gain and clipped,
+    computed exactly like the float32 per-image HSV math
+    """
+    values = np.arange(256, dtype=np.float32) * gain
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+def enhance_batch_advanced(batch_bgr, plan=None):
+    """
+    Run the enhancement stages on a stack of same-size BGR images
+
+    batch_bgr is an (N, H, W, 3) uint8 array. The pointwise stages (shading,
+    HSV gains, vignette, final shading) run once over the whole 4D array
+    with the masks built a single time and broadcast; CLAHE, denoising,
+    glow and sharpening still run image by image. Returns (N, H, W, 3) RGB.
+    The working buffer and masks are float64, as numpy promotes them to in
+    enhance_array_advanced, so the output is identical.
+    """
+    if plan is None:
+        plan = DEFAULT_ENHANCEMENT_PLAN
+    count, height, width = batch_bgr.shape[:3]
+    batch_rgb = np.empty_like(batch_bgr)
+    
+    for i in range(count):
+        cv2.cvtColor(apply_tonal_stages(batch_bgr[i], plan), cv2.COLOR_BGR2RGB, dst=batch_rgb[i])
+    
+    # Shared masks for every image of this size
+    shading = create_smooth_shading_mask(height, width, center_focus=True)[np.newaxis, :, :, np.newaxis]
+    vignette = create_vignette_mask(height, width, plan['vignette_strength'])[np.newaxis, :, :, np.newaxis]
+    
+    # Smooth shading over the whole batch in one float64 working buffer
+    work = batch_rgb.astype(np.float64)
+    work *= shading
+    np.clip(work, 0, 255, out=work)
+    batch_rgb[...] = work
+    
+    if plan['saturation'] != 1 or plan['value'] != 1:
+        # Color conversion is pointwise, so the batch is treated as one tall image
+        tall = batch_rgb.reshape(count * height, width, 3)
+        hsv = cv2.cvtColor(tall, cv2.COLOR_RGB2HSV)
+        hsv[:, :, 1] = gain_lut(plan['saturation'])[hsv[:, :, 1]]
+        hsv[:, :, 2] = gain_lut(plan['value'])[hsv[:, :, 2]]
+        cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB, dst=tall)
+    
+    for i in range(count):
+        batch_rgb[i] = apply_glow_and_sharpen(batch_rgb[i], plan)
+    
+    # Vignette then final shading, reusing the working buffer
+    np.copyto(work, batch_rgb)
+    work *= vignette
+    np.floor(work, out=work)
+    work *= shading
+    batch_rgb[...] = work
+    return batch_rgb
+
+# Working-set estimate per pixel for batch mode: BGR input, RGB output,
+# float64 working buffer and the HSV temporary
+BATCH_BYTES_PER_PIXEL = 36
+
+def save_enhanced(img_rgb, image_path, output_path):
+    """
+    Write an enhanced RGB array: JPEG outputs use the 'master' encoder
+    profile, other formats are written by OpenCV as before
+    """
+    if is_jpeg_path(output_path):
+        save_array_jpeg(img_rgb, output_path, 'master', source_path=image_path,
+                        baseline={'quality': 98})
+    else:
+        cv2.imwrite(str(output_path), cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR))
+
+def enhance_images_batch(jobs, memory_cap_mb=512, plan=None):
+    """
+    Enhance (image_path, output_path) jobs in same-size batches
+
+    Images are grouped by decoded shape (read from headers) and stacked
+    into (N, H, W, 3) arrays no larger than memory_cap_mb, which go through
+    enhance_batch_advanced together. A batch that fails is finished one
+    image at a time through enhance_image_advanced. Returns the number of
+    images enhanced. plan defaults to tuned_enhancement_plan().
+    """
+    from frame_transport import probe_frame_shape
+    
+    if plan is None:
+        plan = tuned_enhancement_plan()
+    groups = {}
+    for image_path, output_path in jobs:
+        try:
+            shape = probe_frame_shape(image_path)
+        except Exception as e:
+            print(f"✗ Error reading {image_path}: {str(e)}")
+            continue
+        groups.setdefault(shape, []).append((image_path, output_path))
+    
+    success_count = 0
+    for (height, width, _), group in groups.items():
+        per_image = height * width * BATCH_BYTES_PER_PIXEL
+        batch_size = max(1, int(memory_cap_mb * 1024 * 1024 // per_image))
+        for start in range(0, len(group), batch_size):
+            chunk = group[start:start + batch_size]
+            batch = np.empty((len(chunk), height, width, 3), dtype=np.uint8)
+            loaded = []
+            for image_path, output_path in chunk:
+                img_bgr = cv2.imread(str(image_path))
+                if img_bgr is None or img_bgr.shape != batch.shape[1:]:
+                    print(f"✗ Error enhancing {image_path}: could not decode at {width}x{height}")
+                    continue
+                batch[len(loaded)] = img_bgr
+                loaded.append((image_path, output_path))
+            if not loaded:
+                continue
+            
+            saved = 0
+            try:
+                enhanced = enhance_batch_advanced(batch[:len(loaded)], plan)
+                for (image_path, output_path), img_rgb in zip(loaded, enhanced):
+                    save_enhanced(img_rgb, image_path, output_path)
+                    print(f"✓ Enhanced (AI Advanced + Effects, batch of {len(loaded)}): "
+                          f"{os.path.basename(image_path)}")
+                    saved += 1
+            except Exception as e:
+                # Finish the rest of the batch one image at a time, so one
+                # bad image doesn't stop the run
+                print(f"✗ Batch of {len(loaded)} failed ({str(e)}), enhancing one by one")
+                for image_path, output_path in loaded[saved:]:
+                    if enhance_image_advanced(image_path, output_path, plan=plan):
+                        saved += 1
+            success_count += saved
+    return success_count
+
+def enhance_image_advanced(image_path, output_path, adaptive=False, plan=None):
     """
     Advanced AI-powered image enhancement with smooth shading and effects
+    If adaptive is True, stages are chosen per image from cheap statistics
+    plan overrides the stage settings, which otherwise come from
+    tuned_enhancement_plan(); the PIL fallback ignores it
     """
+    # Resolved outside the try so a broken enhancement_plan.json raises
+    # instead of silently switching every image to the PIL fallback
+    if plan is None:
+        plan = tuned_enhancement_plan()
+    else:
+        plan = dict(DEFAULT_ENHANCEMENT_PLAN, **plan)
     try:
         # Read image
         if OPENCV_AVAILABLE:
@@ -77,74 +466,15 @@ def enhance_image_advanced(image_path, output_path):
             if img_bgr is None:
                 return False
             
-            height, width = img_bgr.shape[:2]
-            
-            # Convert BGR to RGB for processing
-            img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB).astype(np.float32)
-            
-            # Convert to LAB color space for better color manipulation
-            lab = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2LAB)
-            l, a, b = cv2.split(lab)
-            
-            # Advanced CLAHE for brightness and contrast with smooth transitions
-            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-            l_enhanced = clahe.apply(l)
-            
-            # Merge LAB channels
-            lab_enhanced = cv2.merge([l_enhanced, a, b])
-            img_enhanced = cv2.cvtColor(lab_enhanced, cv2.COLOR_LAB2BGR)
-            
-            # Convert to RGB for further processing
-            img_rgb = cv2.cvtColor(img_enhanced, cv2.COLOR_BGR2RGB).astype(np.float32)
+            if adaptive:
+                plan = choose_enhancement_plan(analyze_image_stats(img_bgr), plan)
             
-            # Advanced denoising while preserving details
-            img_rgb_uint8 = img_rgb.astype(np.uint8)
-            img_rgb_uint8 = cv2.fastNlMeansDenoisingColored(
-                cv2.cvtColor(img_rgb_uint8, cv2.COLOR_RGB2BGR), 
-                None, 5, 5, 7, 21
-            )
-            img_rgb = cv2.cvtColor(img_rgb_uint8, cv2.COLOR_BGR2RGB).astype(np.float32)
-            
-            # Smooth shading - apply radial gradient for depth
-            shading_mask = create_smooth_shading_mask(height, width, center_focus=True)
-            img_rgb = img_rgb * shading_mask[:, :, np.newaxis]
-            img_rgb = np.clip(img_rgb, 0, 255)
-            
-            # Enhance saturation for scenic look
-            img_rgb_uint8 = img_rgb.astype(np.uint8)
-            hsv = cv2.cvtColor(img_rgb_uint8, cv2.COLOR_RGB2HSV).astype(np.float32)
-            h, s, v = cv2.split(hsv)
-            
-            # Increase saturation by 25% for vibrant scenic look
-            s = s * 1.25
-            s = np.clip(s, 0, 255)
-            # Slightly increase brightness
-            v = v * 1.15
-            v = np.clip(v, 0, 255)
-            hsv_enhanced = cv2.merge([h, s, v]).astype(np.uint8)
-            img_rgb = cv2.cvtColor(hsv_enhanced, cv2.COLOR_HSV2RGB).astype(np.float32)
-            
-            # Apply subtle glow effect
-            img_rgb = apply_glow_effect(img_rgb.astype(np.uint8), intensity=0.08).astype(np.float32)
-            
-            # Advanced sharpening using unsharp mask
-            gaussian = cv2.GaussianBlur(img_rgb.astype(np.uint8), (0, 0), 1.5)
-            img_rgb = cv2.addWeighted(img_rgb.astype(np.uint8), 1.8, gaussian, -0.8, 0)
-            img_rgb = np.clip(img_rgb, 0, 255).astype(np.uint8)
-            
-            # Apply smooth vignette effect
-            img_rgb = apply_vignette_effect(img_rgb, strength=0.12)
-            
-            # Final smooth shading overlay for depth
-            final_shading = create_smooth_shading_mask(height, width, center_focus=True)
-            img_rgb = (img_rgb.astype(np.float32) * final_shading[:, :, np.newaxis]).astype(np.uint8)
-            
-            # Convert back to BGR for saving
-            img_final = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
-            
-            # Save with high quality
-            cv2.imwrite(str(output_path), img_final, [cv2.IMWRITE_JPEG_QUALITY, 98])
+            img_rgb = enhance_array_advanced(img_bgr, plan)
+            save_enhanced(img_rgb, image_path, output_path)
             print(f"✓ Enhanced (AI Advanced + Effects): {os.path.basename(image_path)}")
+            # Adaptive runs always say what was chosen, even the full plan
+            if adaptive or plan != DEFAULT_ENHANCEMENT_PLAN:
+                print(f"  stages: {describe_plan(plan)}")
             return True
             
         else:
@@ -156,60 +486,121 @@ def enhance_image_advanced(image_path, output_path):
         # Fallback to PIL
         return enhance_image_pil_advanced(image_path, output_path)
 
-def create_gradient_mask_pil(size, center_focus=True):
+@lru_cache(maxsize=4)
+def gradient_mask_array(size, center_focus=True):
     """
-    Create a smooth gradient mask using PIL
+    Build the shading mask as a read-only uint8 array (255 = unchanged)
+    Cached because the same mask is applied twice per image
     """
-    from PIL import ImageDraw
-    
-    mask = Image.new('L', size, 255)
-    draw = ImageDraw.Draw(mask)
-    
     width, height = size
     if center_focus:
         # Radial gradient from center
         center_x, center_y = width // 2, height // 2
         max_radius = int(np.sqrt(center_x**2 + center_y**2))
-        
-        for y in range(height):
-            for x in range(width):
-                dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
-                intensity = int(255 * (1 - (dist / max_radius) * 0.3))
-                intensity = max(178, min(255, intensity))  # 70-100% range
-                mask.putpixel((x, y), intensity)
+        y, x = np.ogrid[:height, :width]
+        dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
+        mask = (255 * (1 - (dist / max_radius) * 0.3)).astype(np.int32)
+        mask = np.clip(mask, 178, 255)  # 70-100% range
     else:
         # Linear gradient from top
-        for y in range(height):
-            intensity = int(255 * (1 - (y / height) * 0.2))
-            intensity = max(204, min(255, intensity))  # 80-100% range
-            draw.rectangle([(0, y), (width, y+1)], fill=intensity)
-    
+        y = np.arange(height)[:, np.newaxis]
+        mask = (255 * (1 - (y / height) * 0.2)).astype(np.int32)
+        mask = np.clip(mask, 204, 255)  # 80-100% range
+        mask = np.broadcast_to(mask, (height, width))
+    mask = np.ascontiguousarray(mask, dtype=np.uint8)
+    mask.flags.writeable = False
+    return mask
+
+@lru_cache(maxsize=4)
+def vignette_mask_array(size, strength=0.15):
+    """
+    Build the vignette mask as a read-only uint8 array (255 = unchanged)
+    """
+    width, height = size
+    center_x, center_y = width // 2, height // 2
+    max_radius = np.sqrt(center_x**2 + center_y**2)
+    y, x = np.ogrid[:height, :width]
+    dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
+    intensity = np.clip(1 - (dist / max_radius) * strength, 0.85, 1.0)
+    mask = (intensity * 255).astype(np.uint8)
+    mask.flags.writeable = False
     return mask
 
+def multiply_masks_pil(img, masks):
+    """
+    Multiply an 8-bit image (L, LA, RGB, RGBA) by one or more uint8 masks
+    in a single pass
+
+    The masks are combined first, then the image is scaled with uint16
+    fixed-point math in one reusable buffer instead of float32 copies.
+    """
+    combined = masks[0].astype(np.uint16)
+    for mask in masks[1:]:
+        combined *= mask
+        combined //= 255
+    work = np.asarray(img, dtype=np.uint16)
+    if work.ndim == 3:
+        # Every channel is scaled, alpha included, as the original did
+        combined = combined[:, :, np.newaxis]
+    work *= combined
+    work //= 255
+    out = work.astype(np.uint8)
+    return Image.frombuffer(img.mode, img.size, out, 'raw', img.mode, 0, 1)
+
+def create_gradient_mask_pil(size, center_focus=True):
+    """
+    Create a smooth gradient mask using PIL
+    """
+    return Image.fromarray(gradient_mask_array(tuple(size), center_focus), 'L')
+
 def apply_vignette_pil(img, strength=0.15):
     """
     Apply vignette effect using PIL
     """
-    width, height = img.size
-    mask = Image.new('L', (width, height), 255)
+    return multiply_masks_pil(img, [vignette_mask_array(img.size, strength)])
+
+def enhance_pil_image_advanced(img):
+    """
+    Run the PIL enhancement stages on an opened image and return the result
+    """
+    # Convert to RGB if necessary
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
     
-    center_x, center_y = width // 2, height // 2
-    max_radius = np.sqrt(center_x**2 + center_y**2)
+    # Auto-contrast for better dynamic range
+    img = ImageOps.autocontrast(img, cutoff=2)
     
-    for y in range(height):
-        for x in range(width):
-            dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
-            intensity = 1 - (dist / max_radius) * strength
-            intensity = max(0.85, min(1.0, intensity))
-            mask.putpixel((x, y), int(intensity * 255))
+    # Apply smooth shading mask for depth
+    shading_mask = gradient_mask_array(img.size, center_focus=True)
+    img = multiply_masks_pil(img, [shading_mask])
     
-    # Apply vignette
-    img_array = np.array(img)
-    mask_array = np.array(mask) / 255.0
-    if len(img_array.shape) == 3:
-        mask_array = mask_array[:, :, np.newaxis]
-    img_array = (img_array * mask_array).astype(np.uint8)
-    return Image.fromarray(img_array)
+    # Aggressive brightness enhancement for scenic look
+    enhancer = ImageEnhance.Brightness(img)
+    img = enhancer.enhance(1.25)  # 25% brighter
+    
+    # Strong contrast enhancement
+    enhancer = ImageEnhance.Contrast(img)
+    img = enhancer.enhance(1.3)  # 30% more contrast
+    
+    # Vibrant color saturation for scenic look
+    enhancer = ImageEnhance.Color(img)
+    img = enhancer.enhance(1.35)  # 35% more vibrant
+    
+    # Apply subtle glow effect by blending in a Gaussian blur (8% glow)
+    img = Image.blend(img, img.filter(ImageFilter.GaussianBlur(radius=3)), 0.08)
+    
+    # Strong sharpness enhancement for HD look
+    enhancer = ImageEnhance.Sharpness(img)
+    img = enhancer.enhance(1.5)  # 50% sharper
+    
+    # Apply subtle unsharp mask for extra clarity
+    img = img.filter(ImageFilter.UnsharpMask(radius=2, percent=150, threshold=3))
+    
+    # Smooth vignette and final shading overlay, applied in one pass
+    vignette_mask = vignette_mask_array(img.size, 0.12)
+    img = multiply_masks_pil(img, [vignette_mask, shading_mask])
+    
+    return img
 
 def enhance_image_pil_advanced(image_path, output_path):
     """
@@ -217,60 +608,19 @@ def enhance_image_pil_advanced(image_path, output_path):
     """
     try:
         
-        # Open image
-        img = Image.open(image_path)
-        
-        # Convert to RGB if necessary
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Auto-contrast for better dynamic range
-        img = ImageOps.autocontrast(img, cutoff=2)
-        
-        # Apply smooth shading mask for depth
-        shading_mask = create_gradient_mask_pil(img.size, center_focus=True)
-        img_array = np.array(img).astype(np.float32)
-        mask_array = np.array(shading_mask) / 255.0
-        img_array = img_array * mask_array[:, :, np.newaxis]
-        img = Image.fromarray(np.clip(img_array, 0, 255).astype(np.uint8))
-        
-        # Aggressive brightness enhancement for scenic look
-        enhancer = ImageEnhance.Brightness(img)
-        img = enhancer.enhance(1.25)  # 25% brighter
-        
-        # Strong contrast enhancement
-        enhancer = ImageEnhance.Contrast(img)
-        img = enhancer.enhance(1.3)  # 30% more contrast
+        # Open image (EXIF orientation is applied here, since the encoder
+        # profile strips EXIF from the output), then move it to sRGB while
+        # the ICC profile still matches the pixels
+        img = ImageOps.exif_transpose(Image.open(image_path))
+        img, icc_profile = prepare_color(img)
         
-        # Vibrant color saturation for scenic look
-        enhancer = ImageEnhance.Color(img)
-        img = enhancer.enhance(1.35)  # 35% more vibrant
+        img = enhance_pil_image_advanced(img)
         
-        # Apply subtle glow effect using Gaussian blur blend
-        img_array = np.array(img).astype(np.float32)
-        blurred = np.array(img.filter(ImageFilter.GaussianBlur(radius=3))).astype(np.float32)
-        glowed = img_array * 0.92 + blurred * 0.08  # 8% glow
-        img = Image.fromarray(np.clip(glowed, 0, 255).astype(np.uint8))
-        
-        # Strong sharpness enhancement for HD look
-        enhancer = ImageEnhance.Sharpness(img)
-        img = enhancer.enhance(1.5)  # 50% sharper
-        
-        # Apply subtle unsharp mask for extra clarity
-        img = img.filter(ImageFilter.UnsharpMask(radius=2, percent=150, threshold=3))
-        
-        # Apply smooth vignette effect
-        img = apply_vignette_pil(img, strength=0.12)
-        
-        # Final smooth shading overlay
-        final_shading = create_gradient_mask_pil(img.size, center_focus=True)
-        img_array = np.array(img).astype(np.float32)
-        final_mask = np.array(final_shading) / 255.0
-        img_array = img_array * final_mask[:, :, np.newaxis]
-        img = Image.fromarray(np.clip(img_array, 0, 255).astype(np.uint8))
-        
-        # Save with maximum quality
-        img.save(output_path, quality=98, optimize=False, subsampling=0)
+        if is_jpeg_path(output_path):
+            save_jpeg(img, output_path, 'master', icc_profile=icc_profile,
+                      baseline={'quality': 98, 'optimize': False, 'subsampling': 0})
+        else:
+            img.save(output_path, quality=98, optimize=False, subsampling=0)
         print(f"✓ Enhanced (PIL Advanced + Effects): {os.path.basename(image_path)}")
         return True
         
@@ -280,15 +630,25 @@ def enhance_image_pil_advanced(image_path, output_path):
         traceback.print_exc()
         return False
 
-def enhance_images_in_directory(directory_path, overwrite=False):
+def enhance_images_in_directory(directory_path, overwrite=False, parallel=False, adaptive=False, batch=False,
+                                plan=None):
     """
     Enhance all images in a directory with AI-powered techniques
+    If parallel is True, images are spread across processes by image_scheduler
+    If adaptive is True, each image only gets the stages it needs
+    If batch is True, same-size images are enhanced together as 4D arrays
+    (batches share one plan, so batch mode ignores adaptive)
+    plan replaces the stage settings (tuned_enhancement_plan() by default)
     """
     directory = Path(directory_path)
     if not directory.exists():
         print(f"Directory not found: {directory_path}")
         return
     
+    # Load (and validate) the tuned plan once, before any file is touched
+    if plan is None:
+        plan = tuned_enhancement_plan()
+    
     # Supported image extensions
     image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
     
@@ -317,6 +677,7 @@ def enhance_images_in_directory(directory_path, overwrite=False):
     print()
     
     success_count = 0
+    jobs = []
     for image_file in image_files:
         if overwrite:
             output_path = image_file
@@ -328,11 +689,25 @@ def enhance_images_in_directory(directory_path, overwrite=False):
                 shutil.copy2(image_file, backup_path)
             output_path = image_file
         
-        success = enhance_image_advanced(image_file, output_path)
+        if parallel:
+            jobs.append((image_file, output_path, adaptive, plan))
+            continue
+        if batch and OPENCV_AVAILABLE:
+            jobs.append((image_file, output_path))
+            continue
+        
+        success = enhance_image_advanced(image_file, output_path, adaptive=adaptive, plan=plan)
         
         if success:
             success_count += 1
     
+    if parallel:
+        # Balance worker processes, OpenCV threads and memory per image
+        from image_scheduler import run_jobs
+        success_count, _ = run_jobs(enhance_image_advanced, jobs)
+    elif batch and OPENCV_AVAILABLE:
+        success_count = enhance_images_batch(jobs, plan=plan)
+    
     print()
     print("=" * 60)
     print(f"✓ Enhancement complete: {success_count}/{len(image_files)} images enhanced")
@@ -370,6 +745,11 @@ if __name__ == "__main__":
     # For automation, we'll create backups by default
     overwrite = False
     
+    # Settings picked by enhancement_sweep.py, if a sweep has been run
+    if tuned_enhancement_plan() is not DEFAULT_ENHANCEMENT_PLAN:
+        print(f"Using tuned settings from {TUNED_PLAN_FILENAME}")
+        print()
+    
     enhance_images_in_directory(assets_dir, overwrite=overwrite)
     print()
     print("✨ All done! Images are now scenic, bright, and HD quality!")
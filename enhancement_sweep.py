@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Enhancement Parameter Sweep
+Tunes enhance_image_advanced's settings on cached low-resolution proxies:
+evaluates a grid of parameter sets in parallel, writes contact sheets and
+quality metrics, and saves the winner for full-resolution runs
+"""
+
+import csv
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PIL import Image, ImageDraw
+import numpy as np
+
+from enhance_images_ai import (
+    DEFAULT_ENHANCEMENT_PLAN, OPENCV_AVAILABLE, TUNED_PLAN_FILENAME,
+    apply_finishing_stages, apply_tonal_stages, estimate_noise_sigma,
+)
+from image_metrics import ssim
+from image_placeholders import open_proxy
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+# Longest side of the proxies parameter sets are evaluated on
+SWEEP_PROXY_SIZE = 512
+
+# Size budget of the proxy cache. Least recently used proxies of images
+# outside the current run are evicted beyond it, so sweeping a subset of
+# the assets doesn't throw away the rest.
+SWEEP_CACHE_MAX_MB = 1024
+
+# Values tried for each setting; every combination is one parameter set.
+# Settings not listed keep their DEFAULT_ENHANCEMENT_PLAN value.
+SWEEP_GRID = {
+    'clahe_clip': [2.0, 3.0],
+    'saturation': [1.15, 1.25],
+    'value': [1.05, 1.15],
+    'glow_intensity': [0.04, 0.08],
+    'sharpen_amount': [0.5, 0.8],
+    'vignette_strength': [0.08, 0.12],
+}
+
+# No-reference scoring, averaged over the corpus. Structure (luma SSIM
+# against the unprocessed proxy) guards against over-processing; contrast
+# and colorfulness are rewarded up to a target; newly clipped pixels and
+# amplified noise are penalized.
+TARGET_SPREAD = 200
+TARGET_COLORFULNESS = 55
+SCORE_WEIGHTS = {
+    'structure': 1.0,
+    'contrast': 0.5,
+    'colorfulness': 0.5,
+    'clipped': 5.0,
+    'noise': 0.1,
+}
+
+# Contact sheet layout
+SHEET_COLUMNS = 6
+SHEET_TILE = 240
+SHEET_LABEL_HEIGHT = 16
+SHEET_HEADER_HEIGHT = 40
+
+def build_parameter_grid(grid, base_plan=None):
+    """
+    Expand a grid of setting values into a list of complete plans
+    """
+    base = dict(DEFAULT_ENHANCEMENT_PLAN, **(base_plan or {}))
+    names = list(grid)
+    return [dict(base, **dict(zip(names, values)))
+            for values in itertools.product(*(grid[name] for name in names))]
+
+def proxy_key(image_path, proxy_size):
+    """Cache key of a proxy; changes when the source file changes"""
+    stat = Path(image_path).stat()
+    identity = f"{Path(image_path).name}\0{stat.st_size}\0{stat.st_mtime_ns}\0{proxy_size}"
+    return hashlib.sha1(identity.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+
+def tonal_key(plan):
+    """The settings apply_tonal_stages depends on, as a file name suffix"""
+    return f"clahe{plan['clahe_clip'] or 0}-nlm{plan['denoise_h'] or 0}"
+
+def build_proxy(image_path, proxy_path, proxy_size):
+    """
+    Decode one image at reduced size and cache it as a BGR .npy array
+    Returns the proxy's scale relative to the full-resolution image
+    """
+    width, height, proxy = open_proxy(image_path, proxy_size)
+    img_bgr = np.ascontiguousarray(np.asarray(proxy)[:, :, ::-1])
+    np.save(proxy_path, img_bgr)
+    return max(img_bgr.shape[:2]) / max(width, height)
+
+def build_tonal_stage(proxy_path, output_path, plan):
+    """Run CLAHE and denoising on a cached proxy and cache the result"""
+    np.save(output_path, apply_tonal_stages(np.load(proxy_path), plan))
+    return True
+
+def colorfulness(img_rgb):
+    """Hasler and Suesstrunk colorfulness of an RGB uint8 image"""
+    r, g, b = [img_rgb[:, :, c].astype(np.float32) for c in range(3)]
+    rg = r - g
+    yb = 0.5 * (r + g) - b
+    return float(np.hypot(rg.std(), yb.std()) + 0.3 * np.hypot(rg.mean(), yb.mean()))
+
+def clipped_fraction(img_rgb):
+    """Fraction of pixels with any channel at 0 or 255"""
+    return float(((img_rgb == 0) | (img_rgb == 255)).any(axis=2).mean())
+
+def proxy_metrics(source_rgb, enhanced_rgb):
+    """
+    Quality metrics of one enhanced proxy against its unprocessed source
+    """
+    source_gray = cv2.cvtColor(source_rgb, cv2.COLOR_RGB2GRAY)
+    enhanced_gray = cv2.cvtColor(enhanced_rgb, cv2.COLOR_RGB2GRAY)
+    l_channel = cv2.cvtColor(enhanced_rgb, cv2.COLOR_RGB2LAB)[:, :, 0]
+    low, high = np.percentile(l_channel, [2, 98])
+    return {
+        'structure': ssim(source_gray, enhanced_gray),
+        'contrast': float(high - low),
+        'colorfulness': colorfulness(enhanced_rgb),
+        'clipped': max(0.0, clipped_fraction(enhanced_rgb) - clipped_fraction(source_rgb)),
+        'noise': max(0.0, estimate_noise_sigma(enhanced_gray) - estimate_noise_sigma(source_gray)),
+    }
+
+def score_metrics(metrics):
+    """Combine one image's metrics into a single score (higher is better)"""
+    return (SCORE_WEIGHTS['structure'] * metrics['structure']
+            + SCORE_WEIGHTS['contrast'] * min(metrics['contrast'] / TARGET_SPREAD, 1.0)
+            + SCORE_WEIGHTS['colorfulness'] * min(metrics['colorfulness'] / TARGET_COLORFULNESS, 1.0)
+            - SCORE_WEIGHTS['clipped'] * metrics['clipped']
+            - SCORE_WEIGHTS['noise'] * metrics['noise'])
+
+def render_proxy(proxy, plan):
+    """
+    Run the finishing stages on a proxy's cached tonal stage output
+
+    glow_sigma is in pixels, so it is scaled down with the proxy to keep
+    the glow the same relative size as at full resolution.
+    """
+    proxy_plan = dict(plan, glow_sigma=max(0.5, plan['glow_sigma'] * proxy['scale']))
+    tonal = np.load(proxy['tonal'][tonal_key(plan)])
+    return apply_finishing_stages(tonal, proxy_plan)
+
+def make_contact_sheet(tiles, title, columns=SHEET_COLUMNS):
+    """
+    Lay out (label, RGB array) tiles in a grid under a title line
+    """
+    rows = max(1, math.ceil(len(tiles) / columns))
+    cell_height = SHEET_TILE + SHEET_LABEL_HEIGHT
+    sheet = Image.new('RGB', (columns * SHEET_TILE, SHEET_HEADER_HEIGHT + rows * cell_height), (24, 24, 24))
+    draw = ImageDraw.Draw(sheet)
+    for line_number, line in enumerate(title.split('\n')[:2]):
+        draw.text((6, 6 + line_number * 14), line, fill=(235, 235, 235))
+    for index, (label, img_rgb) in enumerate(tiles):
+        tile = Image.fromarray(img_rgb)
+        tile.thumbnail((SHEET_TILE - 4, SHEET_TILE - 4), Image.Resampling.LANCZOS)
+        left = (index % columns) * SHEET_TILE
+        top = SHEET_HEADER_HEIGHT + (index // columns) * cell_height
+        sheet.paste(tile, (left + (SHEET_TILE - tile.size[0]) // 2, top + (SHEET_TILE - tile.size[1]) // 2))
+        draw.text((left + 4, top + SHEET_TILE), label[:36], fill=(200, 200, 200))
+    return sheet
+
+def describe_settings(plan, names):
+    """Short 'name=value' summary of the swept settings"""
+    return ' '.join(f"{name}={plan[name]}" for name in names)
+
+def _init_worker():
+    # One OpenCV thread per worker process - the sweep is already parallel
+    if OPENCV_AVAILABLE:
+        cv2.setNumThreads(1)
+
+def evaluate_plan(plan_id, plan, proxies, sheet_path, swept_names):
+    """
+    Worker entry point: render every proxy with one plan, write its
+    contact sheet and return (plan_id, mean metrics, mean score)
+    """
+    tiles = []
+    totals = {name: 0.0 for name in SCORE_WEIGHTS}
+    score_total = 0.0
+    for proxy in proxies:
+        source_rgb = np.load(proxy['source'])[:, :, ::-1]
+        enhanced = render_proxy(proxy, plan)
+        metrics = proxy_metrics(np.ascontiguousarray(source_rgb), enhanced)
+        score = score_metrics(metrics)
+        for name in totals:
+            totals[name] += metrics[name]
+        score_total += score
+        tiles.append((f"{score:.3f} {proxy['name']}", enhanced))
+
+    count = max(1, len(proxies))
+    means = {name: total / count for name, total in totals.items()}
+    mean_score = score_total / count
+    title = (f"Plan {plan_id:03d}  score {mean_score:.4f}\n"
+             f"{describe_settings(plan, swept_names)}")
+    make_contact_sheet(tiles, title).save(sheet_path, 'JPEG', quality=85)
+    return plan_id, means, mean_score
+
+def evict_proxy_cache(cache_dir, keep_keys, max_bytes):
+    """
+    Delete the least recently used cached arrays until the cache fits in
+    max_bytes, never touching those of keep_keys
+    Returns the keys whose source proxy is still cached
+    """
+    files = []
+    total_bytes = 0
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith('.npy'):
+            stat = entry.stat()
+            total_bytes += stat.st_size
+            if entry.name[:16] not in keep_keys:
+                files.append((stat.st_mtime_ns, entry.path, stat.st_size))
+    for _, path, size in sorted(files):
+        if total_bytes <= max_bytes:
+            break
+        os.unlink(path)
+        total_bytes -= size
+    # Source proxies are '<key>.npy', tonal stages '<key>-<settings>.npy'
+    return {entry.name[:16] for entry in os.scandir(cache_dir)
+            if entry.name.endswith('.npy') and '-' not in entry.name}
+
+def prepare_proxies(image_files, cache_dir, plans, proxy_size=SWEEP_PROXY_SIZE, workers=None,
+                    max_cache_mb=SWEEP_CACHE_MAX_MB):
+    """
+    Build (or reuse) the cached proxies and tonal stage outputs
+
+    Proxies are decoded once per source file version. CLAHE and NL-means
+    only depend on clahe_clip and denoise_h, so they run once per distinct
+    pair instead of once per parameter set, and are cached on disk too.
+    The cache is kept under max_cache_mb by evict_proxy_cache.
+    Returns a list of proxy descriptions for evaluate_plan.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    index_path = cache_dir / 'proxies.json'
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            scales = json.load(f)
+    except (OSError, ValueError):
+        scales = {}
+
+    tonal_plans = {tonal_key(plan): plan for plan in plans}
+    proxies = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {}
+        for image_file in image_files:
+            key = proxy_key(image_file, proxy_size)
+            proxy = {
+                'name': Path(image_file).name,
+                'key': key,
+                'source': str(cache_dir / f"{key}.npy"),
+                'tonal': {name: str(cache_dir / f"{key}-{name}.npy") for name in tonal_plans},
+                'scale': scales.get(key),
+            }
+            proxies.append(proxy)
+            if proxy['scale'] is None or not Path(proxy['source']).exists():
+                futures[key] = executor.submit(build_proxy, image_file, proxy['source'], proxy_size)
+
+        built = 0
+        for proxy in list(proxies):
+            future = futures.get(proxy['key'])
+            if future is None:
+                continue
+            try:
+                proxy['scale'] = scales[proxy['key']] = future.result()
+                built += 1
+            except Exception as e:
+                print(f"✗ Error creating proxy for {proxy['name']}: {str(e)}")
+                proxies.remove(proxy)
+        print(f"Proxies: {built} built, {len(proxies) - built} reused from cache")
+
+        tonal_jobs = [executor.submit(build_tonal_stage, proxy['source'], path, tonal_plans[name])
+                      for proxy in proxies for name, path in proxy['tonal'].items()
+                      if not Path(path).exists()]
+        for future in tonal_jobs:
+            future.result()
+        print(f"Tonal stages: {len(tonal_jobs)} computed, "
+              f"{len(proxies) * len(tonal_plans) - len(tonal_jobs)} reused "
+              f"({len(tonal_plans)} CLAHE/denoise combination(s))")
+
+    # Mark this run's arrays as recently used, then evict by size; proxies
+    # of changed or removed files are never used again, so they age out
+    for proxy in proxies:
+        for path in [proxy['source'], *proxy['tonal'].values()]:
+            os.utime(path)
+    keys = evict_proxy_cache(cache_dir, {proxy['key'] for proxy in proxies},
+                             max_cache_mb * 1024 * 1024)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({key: scale for key, scale in scales.items() if key in keys}, f, indent=2)
+    return proxies
+
+def run_sweep(image_files, output_dir, cache_dir, grid=None, proxy_size=SWEEP_PROXY_SIZE,
+              workers=None, top_count=5):
+    """
+    Evaluate every parameter set of the grid on cached proxies
+
+    Writes a contact sheet per parameter set, a comparison sheet of the
+    best sets, and metrics.csv to output_dir. Returns (best plan, results)
+    where results is a list of (score, plan_id, plan, means) best first.
+    """
+    grid = grid or SWEEP_GRID
+    output_dir = Path(output_dir)
+    sheets_dir = output_dir / 'plans'
+    sheets_dir.mkdir(parents=True, exist_ok=True)
+    swept_names = list(grid)
+    plans = build_parameter_grid(grid)
+    # The current settings are always evaluated, as the baseline
+    if DEFAULT_ENHANCEMENT_PLAN not in plans:
+        plans.insert(0, dict(DEFAULT_ENHANCEMENT_PLAN))
+    baseline_id = plans.index(DEFAULT_ENHANCEMENT_PLAN)
+
+    start = time.perf_counter()
+    proxies = prepare_proxies(image_files, cache_dir, plans, proxy_size, workers)
+    if not proxies:
+        print("No proxies available")
+        return None, []
+    print(f"Prepared in {time.perf_counter() - start:.1f}s")
+
+    print(f"Evaluating {len(plans)} parameter set(s) on {len(proxies)} proxies...")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(evaluate_plan, plan_id, plan, proxies,
+                                   sheets_dir / f"plan_{plan_id:03d}.jpg", swept_names)
+                   for plan_id, plan in enumerate(plans)]
+        for future in futures:
+            plan_id, means, score = future.result()
+            results.append((score, plan_id, plans[plan_id], means))
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated in {elapsed:.1f}s ({len(plans) * len(proxies) / elapsed:.0f} renders/s)")
+
+    results.sort(key=lambda result: result[0], reverse=True)
+    write_metrics_csv(results, output_dir / 'metrics.csv', swept_names)
+    write_comparison_sheet(results[:top_count], proxies, output_dir / 'comparison.jpg', swept_names)
+
+    print("-" * 78)
+    print(f"{'rank':>4} {'plan':>5} {'score':>7} {'struct':>7} {'spread':>7} {'color':>6} "
+          f"{'clip%':>6}  settings")
+    for rank, (score, plan_id, plan, means) in enumerate(results[:top_count], 1):
+        print(f"{rank:>4} {plan_id:>5} {score:7.4f} {means['structure']:7.4f} {means['contrast']:7.1f} "
+              f"{means['colorfulness']:6.1f} {means['clipped'] * 100:6.2f}  "
+              f"{describe_settings(plan, swept_names)}")
+    baseline = next(result for result in results if result[1] == baseline_id)
+    baseline_rank = results.index(baseline) + 1
+    print(f"Current settings (plan {baseline_id}): score {baseline[0]:.4f}, "
+          f"rank {baseline_rank}/{len(results)}")
+    return results[0][2], results
+
+def write_metrics_csv(results, csv_path, swept_names):
+    """One row per parameter set, best first"""
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'plan', 'score'] + swept_names + list(SCORE_WEIGHTS))
+        for rank, (score, plan_id, plan, means) in enumerate(results, 1):
+            writer.writerow([rank, plan_id, f"{score:.5f}"] + [plan[name] for name in swept_names]
+                            + [f"{means[name]:.5f}" for name in SCORE_WEIGHTS])
+
+def write_comparison_sheet(top_results, proxies, sheet_path, swept_names, columns=SHEET_COLUMNS):
+    """
+    Side-by-side sheet: the unprocessed proxies on the first row, then
+    one row per top parameter set, for the first few images
+    """
+    shown = proxies[:columns]
+    tiles = [(f"original {proxy['name']}", np.load(proxy['source'])[:, :, ::-1].copy())
+             for proxy in shown]
+    for score, plan_id, plan, _ in top_results:
+        for proxy in shown:
+            tiles.append((f"plan {plan_id} ({score:.3f})", render_proxy(proxy, plan)))
+    title = f"Top {len(top_results)} parameter sets (rows) - settings in metrics.csv"
+    make_contact_sheet(tiles, title, columns=columns).save(sheet_path, 'JPEG', quality=85)
+
+def save_plan(plan, plan_path):
+    """Save a plan as JSON for load_enhancement_plan"""
+    with open(plan_path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+
+if __name__ == "__main__":
+    script_dir = Path(__file__).parent
+    assets_dir = script_dir / "attached_assets"
+    output_dir = script_dir / "sweep_results"
+    cache_dir = script_dir / ".sweep-cache"
+
+    print("=" * 78)
+    print("Enhancement Parameter Sweep")
+    print("=" * 78)
+
+    if not OPENCV_AVAILABLE:
+        print("✗ OpenCV is required for the sweep (pip install opencv-python)")
+        raise SystemExit(1)
+
+    # Skip .backup copies left by enhance_images_ai.py
+    image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+    image_files = sorted(f for f in assets_dir.iterdir()
+                         if f.suffix in image_extensions and f.is_file()
+                         and '.backup' not in f.suffixes)
+    print(f"Images: {len(image_files)}, proxy size: {SWEEP_PROXY_SIZE}px")
+    print(f"Output: {output_dir}")
+    print("-" * 78)
+
+    best_plan, results = run_sweep(image_files, output_dir, cache_dir, grid=SWEEP_GRID,
+                                   proxy_size=SWEEP_PROXY_SIZE)
+    if best_plan is not None:
+        # enhance_images_ai.py picks this up for the full-resolution run
+        plan_path = script_dir / TUNED_PLAN_FILENAME
+        save_plan(best_plan, plan_path)
+        print("-" * 78)
+        print(f"✓ Best settings saved to {plan_path.name}; enhance_images_ai.py will use them")
+        print(f"  Contact sheets: {output_dir / 'plans'}, comparison: {output_dir / 'comparison.jpg'}")
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+EXIF Orientation Helpers
+Displayed image dimensions from the file header, before any pixels are
+decoded, shared by the pipeline, the placeholder generator and the service
+"""
+
+# EXIF orientation tag, and the orientations that swap width and height
+# once applied
+ORIENTATION_TAG = 0x0112
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+def is_transposed(img):
+    """Check whether applying an opened image's EXIF orientation swaps its sides"""
+    return img.getexif().get(ORIENTATION_TAG, 1) in TRANSPOSED_ORIENTATIONS
+
+def oriented_size(img):
+    """(width, height) of an opened image once its EXIF orientation is applied"""
+    width, height = img.size
+    return (height, width) if is_transposed(img) else (width, height)
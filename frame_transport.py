@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Frame Transport
+Passes decoded images between pipeline processes as zero-copy NumPy views
+instead of pickling multi-megabyte arrays for every stage
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from pathlib import Path
+from PIL import Image, ImageOps
+import numpy as np
+
+from exif_orientation import oriented_size
+
+class Frame:
+    """
+    A decoded image living in a shared memory block owned by a FramePool
+
+    Only the small handle (block name, shape, dtype) crosses process
+    boundaries; every process maps the same pages.
+    """
+
+    def __init__(self, shm, shape, dtype=np.uint8):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def handle(self):
+        """Picklable description of this frame for other processes"""
+        return (self.shm.name, self.shape, self.dtype.str)
+
+    @property
+    def nbytes(self):
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    @property
+    def array(self):
+        """NumPy view over the shared block (no copy)"""
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+class FramePool:
+    """
+    Allocates shared memory frames and recycles their blocks
+
+    The pool is the single owner of every block: workers only attach to
+    frames by handle, released frames go back on a free list for reuse by
+    the next image of a similar size, and close() unlinks everything.
+    """
+
+    def __init__(self, max_free_blocks=8):
+        self.max_free_blocks = max_free_blocks
+        self.free_blocks = []
+        self.all_blocks = {}
+        self.allocations = 0
+        self.reuses = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        """Get a frame of the given shape, reusing a free block if one fits"""
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        # Best fit among free blocks that are not more than twice too big
+        candidates = [shm for shm in self.free_blocks
+                      if nbytes <= shm.size <= nbytes * 2]
+        if candidates:
+            shm = min(candidates, key=lambda block: block.size)
+            self.free_blocks.remove(shm)
+            self.reuses += 1
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+            self.all_blocks[shm.name] = shm
+            self.allocations += 1
+        return Frame(shm, shape, dtype)
+
+    def release(self, frame):
+        """Return a frame's block to the pool once no stage needs it"""
+        if frame.shm.name not in self.all_blocks:
+            return
+        if len(self.free_blocks) < self.max_free_blocks:
+            self.free_blocks.append(frame.shm)
+        else:
+            self._destroy(frame.shm)
+
+    def _destroy(self, shm):
+        self.all_blocks.pop(shm.name, None)
+        shm.close()
+        shm.unlink()
+
+    def close(self):
+        """Unlink every block allocated by this pool"""
+        for shm in list(self.all_blocks.values()):
+            self._destroy(shm)
+        self.free_blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+@contextmanager
+def attach_frame(handle):
+    """
+    Map a frame in another process from its handle
+
+    The yielded array must be dropped before the block exits, since the
+    mapping is closed there.
+    """
+    name, shape, dtype = handle
+    # Workers are started after the pool's first allocation, so they share
+    # the parent's resource tracker and attaching here cannot cause an
+    # early unlink; the pool remains responsible for unlinking
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        yield np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still referenced (e.g. by a traceback); the mapping
+            # is released when it is garbage collected
+            pass
+
+def probe_frame_shape(image_path):
+    """
+    Get the (height, width, 3) shape an image will have once decoded and
+    auto-oriented, reading only the file header
+    """
+    with Image.open(image_path) as img:
+        width, height = oriented_size(img)
+    return (height, width, 3)
+
+def decode_stage(image_path, frame_handle):
+    """
+    Decode an image file as RGB directly into a shared frame
+    """
+    try:
+        img = Image.open(image_path)
+        img = ImageOps.exif_transpose(img)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        with attach_frame(frame_handle) as frame:
+            frame[...] = np.asarray(img)
+            del frame
+        return True
+    except Exception as e:
+        print(f"✗ Error decoding {image_path}: {str(e)}")
+        return False
+
+def enhance_stage(input_handle, output_handle, adaptive=False, plan=None):
+    """
+    Run enhance_image_advanced's stages on one frame, writing into another
+    plan defaults to enhance_images_ai.tuned_enhancement_plan()
+    """
+    from enhance_images_ai import OPENCV_AVAILABLE, enhance_array_advanced
+    try:
+        with attach_frame(input_handle) as src, attach_frame(output_handle) as dst:
+            if OPENCV_AVAILABLE:
+                import cv2
+                from enhance_images_ai import (
+                    analyze_image_stats, choose_enhancement_plan, tuned_enhancement_plan,
+                )
+                img_bgr = cv2.cvtColor(src, cv2.COLOR_RGB2BGR)
+                if plan is None:
+                    plan = tuned_enhancement_plan()
+                if adaptive:
+                    plan = choose_enhancement_plan(analyze_image_stats(img_bgr), plan)
+                dst[...] = enhance_array_advanced(img_bgr, plan)
+            else:
+                from enhance_images_ai import enhance_pil_image_advanced
+                dst[...] = np.asarray(enhance_pil_image_advanced(Image.fromarray(src)))
+            del src, dst
+        return True
+    except Exception as e:
+        print(f"✗ Error enhancing frame: {str(e)}")
+        return False
+
+def encode_stage(frame_handle, output_path, quality=85, max_dimension=2048):
+    """
+    Encode a shared frame straight to a JPEG file with compress_jpeg
+    """
+    from compress_images import compress_jpeg
+    with attach_frame(frame_handle) as frame:
+        success = compress_jpeg(frame, output_path, quality=quality,
+                                max_dimension=max_dimension)
+        del frame
+    return success
+
+def run_frame_pipeline(image_files, output_dir, quality=85, max_dimension=2048,
+                       workers=None, enhance=True, adaptive=False, plan=None):
+    """
+    Decode, enhance and encode images across worker processes
+    plan overrides the tuned enhancement settings (see enhance_stage)
+
+    Frames are handed between stages by handle only. Each image's input
+    frame is recycled as soon as enhancement finishes, and at most
+    2 x workers images are in flight so memory stays bounded.
+
+    Inputs that would encode to the same file (a.png and a.jpg) are
+    rejected up front; the first one listed is kept.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if enhance and plan is None:
+        # Load the tuned plan here so a broken file fails the run up front
+        # instead of every enhance stage
+        from enhance_images_ai import tuned_enhancement_plan
+        plan = tuned_enhancement_plan()
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    output_paths = {}
+    claimed = {}
+    for image_path in map(Path, image_files):
+        output_name = image_path.with_suffix('.jpg').name
+        # Lowercased so A.jpg and a.jpg also collide on case-insensitive disks
+        owner = claimed.setdefault(output_name.lower(), image_path)
+        if owner != image_path:
+            print(f"✗ Skipping {image_path.name}: {output_name} already comes from {owner.name}")
+            continue
+        output_paths[image_path] = output_dir / output_name
+    pending = list(output_paths)
+    success_count = 0
+    start = time.perf_counter()
+
+    with FramePool(max_free_blocks=max_in_flight) as pool, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+
+        def submit(stage, image_path, frame, source, fn, *args):
+            """Queue one stage, releasing its frames if the worker pool has died"""
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool as e:
+                print(f"✗ Worker pool failed on {image_path.name}: {str(e)}")
+                pool.release(frame)
+                if source is not None:
+                    pool.release(source)
+                return
+            in_flight[future] = (stage, image_path, frame, source)
+
+        def submit_decode(image_path):
+            try:
+                frame = pool.acquire(probe_frame_shape(image_path))
+            except Exception as e:
+                print(f"✗ Error reading {image_path}: {str(e)}")
+                return
+            submit('decode', image_path, frame, None,
+                   decode_stage, image_path, frame.handle)
+
+        while pending and len(in_flight) < max_in_flight:
+            submit_decode(pending.pop(0))
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, image_path, frame, source = in_flight.pop(future)
+                try:
+                    ok = future.result()
+                except Exception as e:
+                    print(f"✗ Worker failed on {image_path.name}: {str(e)}")
+                    ok = False
+
+                if source is not None:
+                    pool.release(source)
+
+                if ok and stage == 'decode' and enhance:
+                    out = pool.acquire(frame.shape)
+                    submit('enhance', image_path, out, frame,
+                           enhance_stage, frame.handle, out.handle, adaptive, plan)
+                elif ok and stage in ('decode', 'enhance'):
+                    submit('encode', image_path, frame, None,
+                           encode_stage, frame.handle, output_paths[image_path],
+                           quality, max_dimension)
+                else:
+                    pool.release(frame)
+                    if ok:
+                        success_count += 1
+                        print(f"✓ {image_path.name}")
+                while pending and len(in_flight) < max_in_flight:
+                    submit_decode(pending.pop(0))
+
+        print(f"Shared memory blocks: {pool.allocations} allocated, {pool.reuses} reused")
+
+    print(f"Pipeline time: {time.perf_counter() - start:.1f}s")
+    return success_count
+
+if __name__ == "__main__":
+    script_dir = Path(__file__).parent
+    assets_dir = script_dir / "attached_assets"
+    output_dir = assets_dir / "pipeline"
+
+    print("=" * 70)
+    print("Shared-Memory Image Pipeline")
+    print("=" * 70)
+    print(f"Processing images in: {assets_dir}")
+    print(f"Output directory: {output_dir}")
+    print("-" * 70)
+
+    image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+    image_files = [f for f in assets_dir.iterdir()
+                   if f.suffix in image_extensions and f.is_file()]
+
+    success_count = run_frame_pipeline(image_files, output_dir, quality=85, max_dimension=2048)
+    print("-" * 70)
+    print(f"Pipeline complete: {success_count}/{len(image_files)} images processed")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Image Quality Metrics
+Vectorized full-reference metrics for comparing pipeline outputs: PSNR,
+windowed SSIM and MS-SSIM computed tile by tile so memory stays bounded on
+large images, and CIEDE2000 color difference
+"""
+
+import numpy as np
+from PIL import Image
+
+# SSIM windows are computed on tiles of at most this many output rows and
+# columns, so the float64 working set is a few MB regardless of image size.
+# PSNR and delta E work on chunks of TILE_SIZE * TILE_SIZE pixels.
+TILE_SIZE = 512
+
+# SSIM stabilizing constants for 8-bit data
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+# Per-scale MS-SSIM weights (Wang, Simoncelli and Bovik 2003)
+MS_SSIM_WEIGHTS = (0.0448, 0.2856, 0.3001, 0.2363, 0.1333)
+
+# sRGB (D65) to CIE XYZ, and the D65 reference white
+SRGB_TO_XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                        [0.2126729, 0.7151522, 0.0721750],
+                        [0.0193339, 0.1191920, 0.9503041]])
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+# 8-bit sRGB value to linear light
+SRGB_LINEAR_LUT = np.where(np.arange(256) / 255 <= 0.04045,
+                           np.arange(256) / 255 / 12.92,
+                           ((np.arange(256) / 255 + 0.055) / 1.055) ** 2.4)
+
+# Delta E percentiles come from a histogram with this resolution and range
+DELTA_E_BIN = 0.01
+DELTA_E_HISTOGRAM_MAX = 100.0
+
+def as_array(img):
+    """A PIL Image or array-like as a NumPy array (no copy for arrays)"""
+    return np.asarray(img)
+
+def luma(img):
+    """BT.601 luma plane of an RGB image, as float32 (grayscale passes through)"""
+    if isinstance(img, Image.Image):
+        img = img.convert('RGB') if img.mode not in ('L', 'RGB') else img
+    img = as_array(img)
+    if img.ndim == 2:
+        return img.astype(np.float32)
+    return (img[..., 0] * np.float32(0.299) + img[..., 1] * np.float32(0.587)
+            + img[..., 2] * np.float32(0.114))
+
+def pixel_chunks(img_a, img_b, chunk_pixels=TILE_SIZE * TILE_SIZE):
+    """Yield matching chunks of two equally shaped images as (pixels, channels) views"""
+    a = as_array(img_a)
+    b = as_array(img_b)
+    if a.shape != b.shape:
+        raise ValueError(f"shape mismatch: {a.shape} vs {b.shape}")
+    channels = a.shape[2] if a.ndim == 3 else 1
+    a = a.reshape(-1, channels)
+    b = b.reshape(-1, channels)
+    for start in range(0, len(a), chunk_pixels):
+        yield a[start:start + chunk_pixels], b[start:start + chunk_pixels]
+
+def psnr(img_a, img_b, data_range=255):
+    """
+    Peak signal-to-noise ratio in dB (inf for identical images)
+    """
+    squared_error = 0
+    count = 0
+    for a, b in pixel_chunks(img_a, img_b):
+        diff = a.astype(np.int32) - b.astype(np.int32)
+        squared_error += int(np.einsum('ij,ij->', diff, diff, dtype=np.int64))
+        count += diff.size
+    if squared_error == 0:
+        return float('inf')
+    return float(10 * np.log10(data_range ** 2 * count / squared_error))
+
+def box_mean(plane, size=8):
+    """Mean over every size x size window (valid region) via an integral image"""
+    integral = np.pad(plane, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    return (integral[size:, size:] - integral[:-size, size:]
+            - integral[size:, :-size] + integral[:-size, :-size]) / (size * size)
+
+def ssim_components(plane_a, plane_b, window=8, tile=TILE_SIZE):
+    """
+    Mean SSIM and mean contrast-structure term of two equally sized planes
+
+    Windows are uniform size x size squares at every valid position. The
+    planes are processed in tiles that overlap by window - 1 pixels, so the
+    result equals a whole-image computation while only one tile's working
+    buffers exist at a time (tile=None processes the image in one piece).
+    """
+    if plane_a.shape != plane_b.shape:
+        raise ValueError(f"shape mismatch: {plane_a.shape} vs {plane_b.shape}")
+    height, width = plane_a.shape
+    if height < window or width < window:
+        raise ValueError(f"image {width}x{height} is smaller than the {window}px SSIM window")
+    out_h, out_w = height - window + 1, width - window + 1
+    tile = tile or max(out_h, out_w)
+
+    ssim_total = 0.0
+    cs_total = 0.0
+    for top in range(0, out_h, tile):
+        bottom = min(top + tile, out_h) + window - 1
+        for left in range(0, out_w, tile):
+            right = min(left + tile, out_w) + window - 1
+            a = plane_a[top:bottom, left:right].astype(np.float64)
+            b = plane_b[top:bottom, left:right].astype(np.float64)
+            mean_a = box_mean(a, window)
+            mean_b = box_mean(b, window)
+            var_a = box_mean(a * a, window) - mean_a * mean_a
+            var_b = box_mean(b * b, window) - mean_b * mean_b
+            covariance = box_mean(a * b, window) - mean_a * mean_b
+            cs_map = (2 * covariance + SSIM_C2) / (var_a + var_b + SSIM_C2)
+            luminance_map = (2 * mean_a * mean_b + SSIM_C1) / (mean_a ** 2 + mean_b ** 2 + SSIM_C1)
+            ssim_total += float((luminance_map * cs_map).sum())
+            cs_total += float(cs_map.sum())
+    count = out_h * out_w
+    return ssim_total / count, cs_total / count
+
+def ssim(plane_a, plane_b, window=8, tile=TILE_SIZE):
+    """
+    SSIM of two equally sized 8-bit planes, using uniform windows
+    """
+    return ssim_components(plane_a, plane_b, window, tile)[0]
+
+def downsample(plane):
+    """Halve a plane by averaging 2x2 blocks (odd edges are dropped)"""
+    height, width = plane.shape[0] // 2 * 2, plane.shape[1] // 2 * 2
+    plane = plane[:height, :width].astype(np.float32)
+    return (plane[0::2, 0::2] + plane[1::2, 0::2] + plane[0::2, 1::2] + plane[1::2, 1::2]) * 0.25
+
+def ms_ssim(plane_a, plane_b, window=8, tile=TILE_SIZE, weights=MS_SSIM_WEIGHTS):
+    """
+    Multi-scale SSIM of two equally sized planes
+
+    Contrast-structure terms of every scale and the full SSIM of the
+    coarsest one are combined with the per-scale weights. Scales where
+    the image would be smaller than the window are dropped and the
+    remaining weights renormalized, so small images still get a score.
+    """
+    levels = []
+    for weight in weights:
+        if min(plane_a.shape) < window:
+            break
+        ssim_value, cs_value = ssim_components(plane_a, plane_b, window, tile)
+        levels.append((weight, ssim_value, cs_value))
+        plane_a, plane_b = downsample(plane_a), downsample(plane_b)
+    if not levels:
+        raise ValueError(f"image is smaller than the {window}px SSIM window")
+
+    total_weight = sum(weight for weight, _, _ in levels)
+    result = 1.0
+    for index, (weight, ssim_value, cs_value) in enumerate(levels):
+        value = ssim_value if index == len(levels) - 1 else cs_value
+        result *= max(value, 0.0) ** (weight / total_weight)
+    return float(result)
+
+def srgb_to_lab(rgb):
+    """CIE L*a*b* (D65) of (..., 3) 8-bit sRGB pixels, as float32"""
+    xyz = SRGB_LINEAR_LUT[rgb] @ (SRGB_TO_XYZ.T / D65_WHITE)
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    lab = np.empty(rgb.shape, dtype=np.float32)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+def ciede2000(lab_a, lab_b):
+    """CIEDE2000 color difference of matching (..., 3) L*a*b* arrays"""
+    l1, a1, b1 = lab_a[..., 0], lab_a[..., 1], lab_a[..., 2]
+    l2, a2, b2 = lab_b[..., 0], lab_b[..., 1], lab_b[..., 2]
+
+    # Chroma-dependent stretch of the a* axis
+    c_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    c_mean7 = c_mean ** 7
+    g = 0.5 * (1 - np.sqrt(c_mean7 / (c_mean7 + 25.0 ** 7)))
+    a1 = a1 * (1 + g)
+    a2 = a2 * (1 + g)
+    c1 = np.hypot(a1, b1)
+    c2 = np.hypot(a2, b2)
+    h1 = np.degrees(np.arctan2(b1, a1)) % 360
+    h2 = np.degrees(np.arctan2(b2, a2)) % 360
+    achromatic = (c1 * c2) == 0
+
+    # Differences; hue differences take the short way round the circle
+    delta_l = l2 - l1
+    delta_c = c2 - c1
+    delta_h = h2 - h1
+    delta_h = np.where(delta_h > 180, delta_h - 360, delta_h)
+    delta_h = np.where(delta_h < -180, delta_h + 360, delta_h)
+    delta_h = np.where(achromatic, 0, delta_h)
+    delta_hue = 2 * np.sqrt(c1 * c2) * np.sin(np.radians(delta_h) / 2)
+
+    # Means; the mean hue also takes the short way round
+    l_mean = (l1 + l2) / 2
+    c_mean = (c1 + c2) / 2
+    h_sum = h1 + h2
+    h_mean = np.where(np.abs(h1 - h2) <= 180, h_sum / 2,
+                      np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2))
+    h_mean = np.where(achromatic, h_sum, h_mean)
+
+    t = (1 - 0.17 * np.cos(np.radians(h_mean - 30)) + 0.24 * np.cos(np.radians(2 * h_mean))
+         + 0.32 * np.cos(np.radians(3 * h_mean + 6)) - 0.20 * np.cos(np.radians(4 * h_mean - 63)))
+    l_offset = (l_mean - 50) ** 2
+    s_l = 1 + 0.015 * l_offset / np.sqrt(20 + l_offset)
+    s_c = 1 + 0.045 * c_mean
+    s_h = 1 + 0.015 * c_mean * t
+    c_mean7 = c_mean ** 7
+    rotation = (-2 * np.sqrt(c_mean7 / (c_mean7 + 25.0 ** 7))
+                * np.sin(np.radians(60 * np.exp(-((h_mean - 275) / 25) ** 2))))
+
+    term_l = delta_l / s_l
+    term_c = delta_c / s_c
+    term_h = delta_hue / s_h
+    return np.sqrt(term_l ** 2 + term_c ** 2 + term_h ** 2 + rotation * term_c * term_h)
+
+def delta_e(img_a, img_b):
+    """
+    CIEDE2000 difference of two sRGB images
+    Returns {'mean', 'p95', 'max'}; p95 is accurate to DELTA_E_BIN
+    """
+    bins = int(DELTA_E_HISTOGRAM_MAX / DELTA_E_BIN) + 1
+    histogram = np.zeros(bins, dtype=np.int64)
+    total = 0.0
+    largest = 0.0
+    count = 0
+    for a, b in pixel_chunks(img_a, img_b):
+        difference = ciede2000(srgb_to_lab(a), srgb_to_lab(b))
+        total += float(difference.sum(dtype=np.float64))
+        largest = max(largest, float(difference.max()))
+        count += len(difference)
+        histogram += np.bincount(np.minimum((difference / DELTA_E_BIN).astype(np.int64), bins - 1),
+                                 minlength=bins)
+    if count == 0:
+        return {'mean': 0.0, 'p95': 0.0, 'max': 0.0}
+    p95_bin = int(np.searchsorted(np.cumsum(histogram), 0.95 * count))
+    return {'mean': total / count, 'p95': min((p95_bin + 1) * DELTA_E_BIN, largest),
+            'max': largest}
+
+def compare_images(img_a, img_b, window=8, tile=TILE_SIZE):
+    """
+    All metrics for two equally sized RGB images: PSNR over all channels,
+    SSIM and MS-SSIM on luma, and CIEDE2000 statistics
+    """
+    a = as_array(img_a)
+    b = as_array(img_b)
+    luma_a, luma_b = luma(a), luma(b)
+    difference = delta_e(a, b)
+    return {
+        'psnr': psnr(a, b),
+        'ssim': ssim(luma_a, luma_b, window, tile),
+        'ms_ssim': ms_ssim(luma_a, luma_b, window, tile),
+        'delta_e': difference['mean'],
+        'delta_e_p95': difference['p95'],
+        'delta_e_max': difference['max'],
+    }
+
+def format_metrics(metrics):
+    """One-line summary of compare_images output"""
+    return (f"PSNR {metrics['psnr']:.1f}dB, SSIM {metrics['ssim']:.4f}, "
+            f"MS-SSIM {metrics['ms_ssim']:.4f}, dE {metrics['delta_e']:.2f} "
+            f"(p95 {metrics['delta_e_p95']:.2f}, max {metrics['delta_e_max']:.1f})")
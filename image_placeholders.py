@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Image Placeholder Generator
+Builds low-quality placeholders for every asset in one decode pass:
+a tiny blurred WebP data URI, a BlurHash string, the dominant color and
+the intrinsic dimensions, written to a JSON index the server merges into
+its API responses
+"""
+
+import base64
+import json
+import math
+import os
+from io import BytesIO
+from pathlib import Path
+from PIL import Image, ImageFilter, ImageOps
+import numpy as np
+
+from exif_orientation import oriented_size
+
+# Index file written next to the assets (served as /assets/placeholders.json)
+INDEX_FILENAME = 'placeholders.json'
+INDEX_VERSION = 2
+
+# Longest side of the decoded proxy all placeholder data is computed from
+PROXY_SIZE = 64
+# Longest side of the embedded blurred WebP placeholder
+LQIP_SIZE = 20
+# BlurHash components (horizontal, vertical)
+BLURHASH_COMPONENTS = (4, 3)
+
+BASE83_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+def encode_base83(value, length):
+    """Encode an integer as a fixed-length base83 string"""
+    result = ''
+    for i in range(1, length + 1):
+        digit = (value // (83 ** (length - i))) % 83
+        result += BASE83_CHARS[digit]
+    return result
+
+def srgb_to_linear(values):
+    """Convert 0-255 sRGB values to linear light (0-1)"""
+    v = np.asarray(values, dtype=np.float64) / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+def linear_to_srgb(value):
+    """Convert a linear light value (0-1) to an 0-255 sRGB integer"""
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * (v ** (1 / 2.4)) - 0.055) * 255 + 0.5)
+
+def _sign_pow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+def encode_blurhash(img, components=BLURHASH_COMPONENTS):
+    """
+    Encode a (small) RGB PIL image as a BlurHash string
+
+    The cosine basis sums are computed for all components and channels in
+    one einsum instead of the per-pixel loops of the reference encoder.
+    """
+    components_x, components_y = components
+    pixels = srgb_to_linear(np.asarray(img.convert('RGB')))
+    height, width = pixels.shape[:2]
+
+    basis_x = np.cos(np.pi * np.outer(np.arange(components_x), np.arange(width)) / width)
+    basis_y = np.cos(np.pi * np.outer(np.arange(components_y), np.arange(height)) / height)
+    # factors[j, i, c] = sum_y sum_x basis_y[j, y] * basis_x[i, x] * pixels[y, x, c]
+    factors = np.einsum('jy,yxc,ix->jic', basis_y, pixels, basis_x) / (width * height)
+    factors *= 2
+    factors[0, 0, :] /= 2
+    factors = factors.reshape(-1, 3)
+
+    dc, ac = factors[0], factors[1:]
+    blurhash = encode_base83((components_x - 1) + (components_y - 1) * 9, 1)
+
+    if len(ac) > 0:
+        actual_max = float(np.abs(ac).max())
+        quantised_max = int(max(0, min(82, math.floor(actual_max * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+        blurhash += encode_base83(quantised_max, 1)
+    else:
+        max_value = 1
+        blurhash += encode_base83(0, 1)
+
+    dc_value = (linear_to_srgb(dc[0]) << 16) + (linear_to_srgb(dc[1]) << 8) + linear_to_srgb(dc[2])
+    blurhash += encode_base83(dc_value, 4)
+
+    for r, g, b in ac:
+        quant = [int(max(0, min(18, math.floor(_sign_pow(c / max_value, 0.5) * 9 + 9.5))))
+                 for c in (r, g, b)]
+        blurhash += encode_base83(quant[0] * 19 * 19 + quant[1] * 19 + quant[2], 2)
+
+    return blurhash
+
+def dominant_color(img, colors=5):
+    """
+    Get the dominant color of a (small) RGB image as a hex string
+    using median-cut quantization
+    """
+    quantized = img.convert('RGB').quantize(colors=colors, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()
+    count, index = max(quantized.getcolors())
+    r, g, b = palette[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+def lqip_data_uri(img, size=LQIP_SIZE, quality=40):
+    """
+    Create a tiny blurred WebP placeholder as a base64 data URI
+    """
+    thumb = img.copy()
+    thumb.thumbnail((size, size), Image.Resampling.LANCZOS)
+    thumb = thumb.filter(ImageFilter.GaussianBlur(radius=1))
+    buffer = BytesIO()
+    thumb.save(buffer, 'WEBP', quality=quality, method=6)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def open_proxy(image_path, proxy_size=PROXY_SIZE):
+    """
+    Open an image once and return (width, height, proxy)
+
+    width and height are the intrinsic dimensions after EXIF orientation.
+    JPEGs are decoded at reduced scale (draft mode) so the full-size
+    image never has to be decompressed.
+    """
+    img = Image.open(image_path)
+    width, height = oriented_size(img)
+
+    img.draft('RGB', (proxy_size * 2, proxy_size * 2))
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Composite transparency onto white, as compress_images does
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.thumbnail((proxy_size, proxy_size), Image.Resampling.LANCZOS)
+    return width, height, img
+
+def compute_placeholder(image_path):
+    """
+    Compute all placeholder data for a single image file
+    """
+    image_path = Path(image_path)
+    width, height, proxy = open_proxy(image_path)
+    stat = image_path.stat()
+    return {
+        'width': width,
+        'height': height,
+        'blurhash': encode_blurhash(proxy),
+        'dominantColor': dominant_color(proxy),
+        'placeholder': lqip_data_uri(proxy),
+        'size': stat.st_size,
+        'mtime': int(stat.st_mtime),
+    }
+
+def load_placeholder_index(index_path):
+    """Load an existing index, or an empty one if missing or unreadable"""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {'version': INDEX_VERSION, 'images': {}}
+
+def save_placeholder_index(index, index_path):
+    """Write the index atomically so the server never reads a partial file"""
+    index_path = Path(index_path)
+    temp_path = index_path.with_suffix('.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(temp_path, index_path)
+
+def update_placeholder_index(image_files, index_path, force=False):
+    """
+    Add or refresh index entries for the given images
+
+    Entries whose file size and modification time are unchanged are kept
+    as they are unless force is True. Returns the number of entries written.
+    """
+    index = load_placeholder_index(index_path)
+    images = index['images']
+    updated = 0
+    for image_file in image_files:
+        image_file = Path(image_file)
+        if not image_file.exists():
+            images.pop(image_file.name, None)
+            continue
+        entry = images.get(image_file.name)
+        stat = image_file.stat()
+        if (not force and entry and entry.get('size') == stat.st_size
+                and entry.get('mtime') == int(stat.st_mtime)):
+            continue
+        try:
+            images[image_file.name] = compute_placeholder(image_file)
+            updated += 1
+            print(f"✓ {image_file.name} ({images[image_file.name]['blurhash']})")
+        except Exception as e:
+            print(f"✗ Error creating placeholder for {image_file}: {str(e)}")
+    save_placeholder_index(index, index_path)
+    return updated
+
+def build_placeholder_index(directory_path, force=False):
+    """
+    Create or refresh the placeholder index for all images in a directory
+    and drop entries for images that no longer exist
+    """
+    directory = Path(directory_path)
+    if not directory.exists():
+        print(f"Directory not found: {directory_path}")
+        return
+
+    # Supported image extensions
+    image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+
+    # Skip .backup copies left by enhance_images_ai.py
+    image_files = [f for f in directory.iterdir()
+                   if f.suffix in image_extensions and f.is_file()
+                   and '.backup' not in f.suffixes]
+    index_path = directory / INDEX_FILENAME
+
+    index = load_placeholder_index(index_path)
+    names = {f.name for f in image_files}
+    stale = [name for name in index['images'] if name not in names]
+    for name in stale:
+        del index['images'][name]
+    save_placeholder_index(index, index_path)
+
+    print(f"Found {len(image_files)} image(s)")
+    print("-" * 70)
+    updated = update_placeholder_index(image_files, index_path, force=force)
+    print("-" * 70)
+    print(f"Placeholders updated: {updated}, unchanged: {len(image_files) - updated}, "
+          f"removed: {len(stale)}")
+    print(f"Index saved to: {index_path}")
+
+if __name__ == "__main__":
+    script_dir = Path(__file__).parent
+    assets_dir = script_dir / "attached_assets"
+
+    print("=" * 70)
+    print("Image Placeholder Generator")
+    print("=" * 70)
+    print(f"Generating placeholders for: {assets_dir}")
+    print()
+
+    build_placeholder_index(assets_dir)
+    print()
+    print("Done!")
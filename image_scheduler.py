@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Resource-Aware Image Scheduler
+Runs per-image jobs in parallel while balancing worker processes, OpenCV
+threads and memory so that large images don't oversubscribe the machine
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from PIL import Image
+
+# getrusage is POSIX only; elsewhere CPU time comes from time.process_time
+# and memory is not measured
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Rough peak working-set per pixel for each kind of job.
+# enhance_image_advanced keeps several uint8/float32 copies of the image
+# alive at once (BGR, LAB, float RGB, shading masks, NL-means buffers),
+# compression only holds the decoded image and the resized copy.
+ENHANCE_BYTES_PER_PIXEL = 64
+COMPRESS_BYTES_PER_PIXEL = 8
+
+# Give one OpenCV thread to every this-many pixels of an image
+PIXELS_PER_THREAD = 4_000_000
+
+def get_cpu_count():
+    """Get the number of CPU cores available to this process"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def get_total_memory_mb():
+    """Get total physical memory in MB (falls back to 4GB if unknown)"""
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+def probe_image_size(image_path):
+    """
+    Read image dimensions from the file header without decoding pixels
+    """
+    try:
+        with Image.open(image_path) as img:
+            return img.size
+    except Exception:
+        return None
+
+def estimate_job_memory_mb(width, height, bytes_per_pixel=ENHANCE_BYTES_PER_PIXEL):
+    """Estimate peak memory of a job processing a width x height image"""
+    return width * height * bytes_per_pixel / (1024 * 1024)
+
+def threads_for_pixels(pixels, cores):
+    """
+    Choose how many OpenCV threads a job gets: big images get more threads
+    (and therefore share the machine with fewer workers), small ones get one
+    """
+    threads = round(pixels / PIXELS_PER_THREAD)
+    return max(1, min(cores, threads))
+
+def plan_jobs(jobs, cores=None, bytes_per_pixel=ENHANCE_BYTES_PER_PIXEL):
+    """
+    Build a schedule entry for every job
+
+    jobs is a list of argument tuples whose first element is the input image
+    path. Returns a list of dicts sorted largest-first, which keeps the big
+    images from being left until the end of the run.
+    """
+    cores = cores or get_cpu_count()
+    planned = []
+    for args in jobs:
+        image_path = Path(args[0])
+        size = probe_image_size(image_path)
+        if size is None:
+            # Header could not be read - guess from the compressed file size
+            pixels = os.path.getsize(image_path) * 4 if image_path.exists() else 0
+            width, height = pixels, 1
+        else:
+            width, height = size
+            pixels = width * height
+        planned.append({
+            'args': args,
+            'name': image_path.name,
+            'pixels': pixels,
+            'memory_mb': estimate_job_memory_mb(width, height, bytes_per_pixel),
+            'threads': threads_for_pixels(pixels, cores),
+        })
+    planned.sort(key=lambda job: job['pixels'], reverse=True)
+    return planned
+
+def process_usage():
+    """(CPU seconds, peak RSS in MB) of the calling process so far"""
+    if resource is None:
+        return time.process_time(), 0.0
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return usage.ru_utime + usage.ru_stime, usage.ru_maxrss / scale
+
+def _run_job(func, threads, args):
+    """
+    Worker entry point: pin OpenCV's thread pool for this job and run it
+
+    Returns (result, usage) where usage holds the job's wall time, the CPU
+    time of all the worker's threads, and how much the worker's peak RSS
+    grew. Workers are reused, so a job only registers growth above the
+    worker's earlier peak; largest-first ordering keeps that close to the
+    job's own footprint.
+    """
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+    cpu_before, rss_before = process_usage()
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    except Exception as e:
+        print(f"✗ Error processing {args[0]}: {str(e)}")
+        result = False
+    elapsed = time.perf_counter() - start
+    cpu_after, rss_after = process_usage()
+    return result, {
+        'pid': os.getpid(),
+        'elapsed': elapsed,
+        'cpu_seconds': cpu_after - cpu_before,
+        'rss_growth_mb': rss_after - rss_before,
+        'peak_rss_mb': rss_after,
+    }
+
+def _pick_next(pending, free_cores, free_memory_mb, running_count):
+    """
+    Return the index of the first pending job that fits in the free budget.
+    A job larger than the whole budget is admitted only when nothing else runs.
+    """
+    for index, job in enumerate(pending):
+        if job['threads'] <= free_cores and job['memory_mb'] <= free_memory_mb:
+            return index
+    if running_count == 0 and pending:
+        return 0
+    return None
+
+def run_jobs(func, jobs, cores=None, memory_budget_mb=None,
+             bytes_per_pixel=ENHANCE_BYTES_PER_PIXEL, verbose=True):
+    """
+    Run func(*args) for every args tuple in jobs across worker processes
+
+    Jobs are admitted while the sum of their OpenCV threads fits in the core
+    budget and the sum of their estimated memory fits in the memory budget.
+    func must be a module-level function so it can be sent to the workers.
+    Returns (success_count, stats) where stats holds the CPU time and peak
+    RSS the workers actually measured.
+    """
+    cores = cores or get_cpu_count()
+    if memory_budget_mb is None:
+        memory_budget_mb = get_total_memory_mb() * 0.5
+
+    pending = plan_jobs(jobs, cores=cores, bytes_per_pixel=bytes_per_pixel)
+    if verbose:
+        print(f"Scheduling {len(pending)} job(s) on {cores} core(s), "
+              f"memory budget {memory_budget_mb:.0f}MB")
+
+    stats = {
+        'jobs': len(pending),
+        'cores': cores,
+        'memory_budget_mb': memory_budget_mb,
+        'cpu_seconds': 0.0,
+        'peak_job_memory_mb': 0.0,
+        'worker_peak_mb': {},
+        'peak_workers': 0,
+        'wall_seconds': 0.0,
+    }
+    success_count = 0
+    running = {}
+    free_cores = cores
+    free_memory_mb = memory_budget_mb
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=cores) as executor:
+        while pending or running:
+            # Admit as many jobs as the budgets allow
+            while pending:
+                index = _pick_next(pending, free_cores, free_memory_mb, len(running))
+                if index is None:
+                    break
+                job = pending.pop(index)
+                future = executor.submit(_run_job, func, job['threads'], job['args'])
+                running[future] = job
+                free_cores -= job['threads']
+                free_memory_mb -= job['memory_mb']
+                stats['peak_workers'] = max(stats['peak_workers'], len(running))
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                free_cores += job['threads']
+                free_memory_mb += job['memory_mb']
+                try:
+                    result, usage = future.result()
+                except Exception as e:
+                    print(f"✗ Worker failed on {job['name']}: {str(e)}")
+                    continue
+                stats['cpu_seconds'] += usage['cpu_seconds']
+                stats['peak_job_memory_mb'] = max(stats['peak_job_memory_mb'],
+                                                  usage['rss_growth_mb'])
+                stats['worker_peak_mb'][usage['pid']] = usage['peak_rss_mb']
+                if result:
+                    success_count += 1
+
+    stats['wall_seconds'] = time.perf_counter() - start
+    if verbose:
+        print_utilization(stats)
+    return success_count, stats
+
+def print_utilization(stats):
+    """Print a short utilization report for a scheduled run"""
+    capacity = stats['wall_seconds'] * stats['cores']
+    utilization = stats['cpu_seconds'] / capacity * 100 if capacity > 0 else 0
+    print(f"Wall time: {stats['wall_seconds']:.1f}s for {stats['jobs']} job(s)")
+    print(f"CPU utilization: {utilization:.1f}% of {stats['cores']} core(s) "
+          f"({stats['cpu_seconds']:.1f}s CPU time)")
+    print(f"Peak workers: {stats['peak_workers']}")
+    if resource is None:
+        print("Memory: not measured on this platform")
+        return
+    # Workers peak at different times, so their sum is an upper bound
+    worker_total_mb = sum(stats['worker_peak_mb'].values())
+    memory_use = (worker_total_mb / stats['memory_budget_mb'] * 100
+                  if stats['memory_budget_mb'] > 0 else 0)
+    print(f"Peak job memory: {stats['peak_job_memory_mb']:.0f}MB RSS growth")
+    print(f"Peak worker memory: {worker_total_mb:.0f}MB across "
+          f"{len(stats['worker_peak_mb'])} worker(s) ({memory_use:.1f}% of budget)")
+
+if __name__ == "__main__":
+    script_dir = Path(__file__).parent
+    assets_dir = script_dir / "attached_assets"
+
+    print("=" * 70)
+    print("Image Scheduler - Plan Preview")
+    print("=" * 70)
+
+    image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+    image_files = [f for f in assets_dir.iterdir()
+                   if f.suffix in image_extensions and f.is_file()]
+
+    cores = get_cpu_count()
+    budget = get_total_memory_mb() * 0.5
+    print(f"Cores: {cores}, Memory budget: {budget:.0f}MB")
+    print("-" * 70)
+    for job in plan_jobs([(f,) for f in image_files], cores=cores):
+        print(f"{job['name']:<50} {job['pixels'] / 1e6:5.1f}MP "
+              f"{job['memory_mb']:7.0f}MB  threads={job['threads']}")
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+On-Demand Image Service
+Serves /{width}/{format}/{asset} renditions of the site's images, rendering
+each one on first request instead of pre-generating every size, and keeps
+them in a size-bounded LRU cache on disk
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+from PIL import Image, ImageOps
+
+from compress_images import open_image_source
+from encoder_profiles import encode_with_profile, prepare_color
+from exif_orientation import is_transposed
+
+# Supported image extensions
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+
+# Only these widths are rendered, so the cache can't be flooded with
+# one-pixel variations. 2048 matches compress_images.py's max dimension.
+RENDITION_WIDTHS = (160, 320, 480, 640, 800, 1024, 1280, 1600, 2048)
+
+# Output formats: content type and file extension
+RENDITION_FORMATS = {
+    'jpeg': ('image/jpeg', '.jpg'),
+    'webp': ('image/webp', '.webp'),
+}
+FORMAT_ALIASES = {'jpg': 'jpeg'}
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+# Bump when rendering changes so stale renditions stop matching
+RENDITION_VERSION = 1
+
+# Renditions are named by source, not content, so browsers revalidate daily
+CACHE_CONTROL = 'public, max-age=86400'
+
+class RenditionCache:
+    """
+    Size-bounded LRU cache of rendered files in a directory
+
+    Recency is kept in memory and mirrored to file modification times, so
+    a restarted service rebuilds the same order from a directory scan.
+    When the total size goes over max_bytes the least recently used files
+    are deleted.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.startswith('.'):
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+            elif entry.name.startswith('.tmp'):
+                # Left over from a write interrupted by a crash
+                os.unlink(entry.path)
+        for _, name, size in sorted(files):
+            self.entries[name] = size
+            self.total_bytes += size
+        with self.lock:
+            self._evict()
+
+    def get(self, key):
+        """
+        Open a cached rendition for reading and mark it most recently used
+        Returns an open binary file, or None on a miss
+        """
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            path = self.cache_dir / key
+            try:
+                # Opened under the lock so eviction can't delete it first;
+                # the open handle stays readable even if it is evicted later
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                self.total_bytes -= self.entries.pop(key)
+                return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return f
+
+    def put(self, key, data):
+        """Store a rendition atomically and evict old ones over the budget"""
+        fd, temp_path = tempfile.mkstemp(prefix='.tmp', dir=self.cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, self.cache_dir / key)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries[key]
+            self.entries[key] = len(data)
+            self.entries.move_to_end(key)
+            self.total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        # The newest entry is kept even if it alone is over the budget
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(self.cache_dir / name)
+            except FileNotFoundError:
+                pass
+
+class RequestCoalescer:
+    """
+    Runs one computation per key at a time: callers that arrive while it
+    is in flight wait for the same result instead of starting their own
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def run(self, key, func):
+        """Return (result, True if this call did the work)"""
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.in_flight[key] = future
+        if not leader:
+            return future.result(), False
+        try:
+            result = func()
+            future.set_result(result)
+            return result, True
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+def render_rendition(source_path, width, fmt):
+    """
+    Render one rendition of an image file and return the encoded bytes
+
+    JPEGs are decoded at reduced scale (draft mode) when the target is much
+    smaller than the source. Images are never upscaled.
+    """
+    img = open_image_source(source_path)
+    source_width, source_height = img.size
+    transposed = is_transposed(img)
+    if transposed:
+        source_width, source_height = source_height, source_width
+
+    width = min(width, source_width)
+    height = max(1, round(source_height * width / source_width))
+    img.draft('RGB', (height, width) if transposed else (width, height))
+    img = ImageOps.exif_transpose(img)
+    if img.size[0] > width:
+        img = img.resize((width, height), Image.Resampling.LANCZOS)
+
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+    img, icc_profile = prepare_color(img)
+    if fmt == 'jpeg':
+        if has_alpha:
+            # Flatten to white, as compress_png does
+            rgba = img.convert('RGBA')
+            img = Image.new('RGB', rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.split()[3])
+        data, _ = encode_with_profile(img, 'web', quality=JPEG_QUALITY, icc_profile=icc_profile,
+                                      measure_baseline=False)
+        return data
+
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+    buffer = BytesIO()
+    options = {'quality': WEBP_QUALITY, 'method': 4}
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    img.save(buffer, 'WEBP', **options)
+    return buffer.getvalue()
+
+class ImageService:
+    """
+    Resolves rendition requests against the assets directory, serving from
+    the disk cache and rendering (once per rendition) on a miss
+    """
+
+    def __init__(self, assets_dir, cache_dir, max_cache_mb=512, render_workers=None):
+        self.assets_dir = Path(assets_dir)
+        self.cache = RenditionCache(cache_dir, int(max_cache_mb * 1024 * 1024))
+        self.coalescer = RequestCoalescer()
+        # Renders are CPU bound; cap them so a burst of misses can't starve hits
+        self.render_slots = threading.BoundedSemaphore(render_workers or os.cpu_count() or 1)
+        self.stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'not_modified': 0,
+                      'errors': 0, 'render_seconds': 0.0}
+
+    def _count(self, name, amount=1):
+        with self.stats_lock:
+            self.stats[name] += amount
+
+    def resolve(self, width, fmt, asset):
+        """
+        Validate a request and return (source path, width, format)
+        Raises LookupError (404) or ValueError (400)
+        """
+        fmt = FORMAT_ALIASES.get(fmt.lower(), fmt.lower())
+        if fmt not in RENDITION_FORMATS:
+            raise ValueError(f"unsupported format {fmt!r}, use one of: {', '.join(RENDITION_FORMATS)}")
+        try:
+            width = int(width)
+        except ValueError:
+            raise ValueError(f"invalid width {width!r}")
+        if width not in RENDITION_WIDTHS:
+            raise ValueError(f"width must be one of {', '.join(map(str, RENDITION_WIDTHS))}")
+        # Assets are a flat directory: no separators, no hidden files
+        if not asset or '/' in asset or '\\' in asset or asset.startswith('.'):
+            raise LookupError(asset)
+        source_path = self.assets_dir / asset
+        if source_path.suffix not in IMAGE_EXTENSIONS or not source_path.is_file():
+            raise LookupError(asset)
+        return source_path, width, fmt
+
+    def rendition_key(self, source_path, width, fmt):
+        """
+        Cache file name for a rendition; it changes whenever the source file
+        is replaced, so updated assets never serve stale renditions
+        """
+        stat = source_path.stat()
+        identity = f"{source_path.name}\0{stat.st_size}\0{stat.st_mtime_ns}\0{width}\0{fmt}\0{RENDITION_VERSION}"
+        digest = hashlib.sha1(identity.encode('utf-8', 'surrogateescape')).hexdigest()[:24]
+        return f"{width}-{digest}{RENDITION_FORMATS[fmt][1]}"
+
+    def _render_and_store(self, key, source_path, width, fmt):
+        """
+        Render a rendition and cache it. Runs as the coalescer's leader, so
+        the cache is checked again first: a leader that finished between
+        this request's cache miss and taking the lead has already stored it.
+        Returns (data, True if it was rendered here).
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            with cached:
+                return cached.read(), False
+        with self.render_slots:
+            start = time.perf_counter()
+            data = render_rendition(source_path, width, fmt)
+            self._count('render_seconds', time.perf_counter() - start)
+        self.cache.put(key, data)
+        return data, True
+
+    def get(self, width, fmt, asset, etag=None):
+        """
+        Handle one request
+        Returns (status, headers, body) where body is bytes or an open file
+        """
+        try:
+            source_path, width, fmt = self.resolve(width, fmt, asset)
+        except LookupError:
+            return 404, {}, b'Not found\n'
+        except ValueError as e:
+            return 400, {}, f"Bad request: {e}\n".encode()
+
+        key = self.rendition_key(source_path, width, fmt)
+        headers = {
+            'Content-Type': RENDITION_FORMATS[fmt][0],
+            'Cache-Control': CACHE_CONTROL,
+            'ETag': f'"{key}"',
+        }
+        if etag == headers['ETag']:
+            self._count('not_modified')
+            return 304, headers, b''
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count('hits')
+            headers['X-Cache'] = 'HIT'
+            return 200, headers, cached
+
+        try:
+            (data, rendered), leader = self.coalescer.run(
+                key, lambda: self._render_and_store(key, source_path, width, fmt))
+        except Exception as e:
+            self._count('errors')
+            print(f"✗ Error rendering {asset} at {width}px {fmt}: {str(e)}")
+            return 500, {}, b'Rendering failed\n'
+        if not leader:
+            self._count('coalesced')
+            headers['X-Cache'] = 'COALESCED'
+        elif rendered:
+            self._count('misses')
+            headers['X-Cache'] = 'MISS'
+        else:
+            self._count('hits')
+            headers['X-Cache'] = 'HIT'
+        return 200, headers, data
+
+    def snapshot(self):
+        """Counters plus cache occupancy, for the /_stats endpoint"""
+        with self.stats_lock:
+            stats = dict(self.stats)
+        with self.cache.lock:
+            stats.update({
+                'cache_entries': len(self.cache.entries),
+                'cache_bytes': self.cache.total_bytes,
+                'cache_max_bytes': self.cache.max_bytes,
+                'evictions': self.cache.evictions,
+            })
+        return stats
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for ImageService (GET and HEAD)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        service = self.server.service
+        path = urlsplit(self.path).path
+        if path == '/_stats':
+            status, headers = 200, {'Content-Type': 'application/json', 'Cache-Control': 'no-store'}
+            body = json.dumps(service.snapshot()).encode()
+        else:
+            parts = path.lstrip('/').split('/', 2)
+            if len(parts) != 3:
+                status, headers, body = 404, {}, b'Not found\n'
+            else:
+                width, fmt, asset = parts
+                status, headers, body = service.get(width, fmt, unquote(asset),
+                                                    etag=self.headers.get('If-None-Match'))
+
+        try:
+            if hasattr(body, 'read'):
+                length = os.fstat(body.fileno()).st_size
+            else:
+                length = len(body)
+            self.send_response(status)
+            headers.setdefault('Content-Type', 'text/plain; charset=utf-8')
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(length))
+            self.end_headers()
+            if send_body and status != 304:
+                if hasattr(body, 'read'):
+                    shutil.copyfileobj(body, self.wfile)
+                else:
+                    self.wfile.write(body)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+    def log_message(self, format, *args):
+        # Apache already logs every request
+        pass
+
+class ImageHTTPServer(ThreadingHTTPServer):
+    """One thread per connection, with a listen backlog for bursts"""
+
+    daemon_threads = True
+    # The default backlog of 5 drops connections (1s SYN retry) under bursts
+    request_queue_size = 128
+
+def create_server(assets_dir, cache_dir, host='127.0.0.1', port=5050, max_cache_mb=512,
+                  render_workers=None):
+    """Create (but don't start) the HTTP server; port 0 picks a free port"""
+    server = ImageHTTPServer((host, port), ImageRequestHandler)
+    server.service = ImageService(assets_dir, cache_dir, max_cache_mb=max_cache_mb,
+                                  render_workers=render_workers)
+    return server
+
+if __name__ == "__main__":
+    script_dir = Path(__file__).parent
+    assets_dir = script_dir / "attached_assets"
+    cache_dir = script_dir / ".rendition-cache"
+
+    print("=" * 70)
+    print("On-Demand Image Service")
+    print("=" * 70)
+
+    # Apache proxies /img/ here (see scripts/PROXY/apache-image-service.conf)
+    server = create_server(assets_dir, cache_dir, host='127.0.0.1', port=5050, max_cache_mb=512)
+    cache = server.service.cache
+    print(f"Assets: {assets_dir}")
+    print(f"Cache: {cache_dir} ({cache.total_bytes / (1024 * 1024):.1f}MB of "
+          f"{cache.max_bytes / (1024 * 1024):.0f}MB, {len(cache.entries)} rendition(s))")
+    print(f"Widths: {', '.join(map(str, RENDITION_WIDTHS))}; formats: {', '.join(RENDITION_FORMATS)}")
+    print("Listening on http://127.0.0.1:5050/{width}/{format}/{asset}")
+    print("-" * 70)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+    print(f"Stopped: {json.dumps(server.service.snapshot())}")
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Golden-Output Parity Check
+Runs the optimized compression and enhancement paths and their reference
+implementations on a deterministic synthetic corpus, fails if any output
+drifts beyond its tolerance, and reports metric throughput
+"""
+
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+from PIL import Image
+import numpy as np
+
+import compress_images
+import compress_reference
+import enhance_images_ai
+import enhance_reference
+import frame_transport
+from benchmark_enhancement import make_test_image, measure
+from encoder_profiles import save_jpeg
+from image_metrics import compare_images, delta_e, format_metrics, luma, ms_ssim, psnr, ssim
+
+if enhance_images_ai.OPENCV_AVAILABLE:
+    import cv2
+
+# Synthetic inputs; the odd portrait size catches off-by-one and
+# orientation mistakes in masks, tiling and resizing. Kept small because
+# the PIL reference builds its masks pixel by pixel.
+CORPUS_SIZES = [(256, 192), (161, 215)]
+
+# Tolerances of an optimized output against the reference output: minimum
+# PSNR (dB), SSIM and MS-SSIM, maximum mean and 95th percentile CIEDE2000.
+# In-memory paths must match the reference almost exactly.
+IN_MEMORY_TOLERANCES = {'psnr': 45.0, 'ssim': 0.995, 'ms_ssim': 0.995,
+                        'delta_e': 0.3, 'delta_e_p95': 1.0}
+# Compressed files go through the 'web' encoder profile, which may pick
+# finer chroma subsampling than the reference's 4:2:0
+ENCODED_TOLERANCES = {'psnr': 36.0, 'ssim': 0.97, 'ms_ssim': 0.98,
+                      'delta_e': 1.0, 'delta_e_p95': 2.5}
+# Enhanced files are compared with the reference pixels encoded through
+# the same 'master' profile; the OpenCV path writes identical files
+MASTER_TOLERANCES = IN_MEMORY_TOLERANCES
+# The PIL path's 1-level rounding differences flip some quantized DCT
+# coefficients, which costs ~40dB PSNR and ~0.9 mean delta E once encoded.
+# A 1.08x saturation change already gives ~33dB and ~1.9.
+PIL_MASTER_TOLERANCES = {'psnr': 38.0, 'ssim': 0.995, 'ms_ssim': 0.998,
+                         'delta_e': 1.2, 'delta_e_p95': 3.2}
+
+# Image statistics for which choose_enhancement_plan keeps every stage at
+# full strength: low contrast spread, dull, dark, noisy (sigma 10/3 gives
+# denoise h=5) and soft
+FULL_STRENGTH_STATS = {'spread': 100.0, 'mean_saturation': 60.0, 'mean_value': 100.0,
+                       'noise_sigma': 10 / 3, 'sharpness': 100.0}
+
+def quiet(func, *args, **kwargs):
+    """Call func with its progress output suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+def load_rgb(image_path):
+    """Decode an output file as an RGB array, compositing alpha onto white"""
+    img = Image.open(image_path)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])
+        img = background
+    return np.asarray(img.convert('RGB'))
+
+def make_corpus(corpus_dir):
+    """
+    Write the synthetic inputs to corpus_dir
+    Returns {'jpeg': [...], 'png': [...]} lists of paths
+    """
+    corpus_dir = Path(corpus_dir)
+    corpus = {'jpeg': [], 'png': []}
+    for seed, (width, height) in enumerate(CORPUS_SIZES):
+        img = make_test_image(width, height, seed=seed)
+        label = f"{width}x{height}"
+
+        jpeg_path = corpus_dir / f"photo_{label}.jpg"
+        img.save(jpeg_path, 'JPEG', quality=95)
+        corpus['jpeg'].append(jpeg_path)
+
+        png_path = corpus_dir / f"opaque_{label}.png"
+        img.save(png_path)
+        corpus['png'].append(png_path)
+
+        # A small transparent corner: under 5%, so it is flattened to JPEG
+        alpha = np.full((height, width), 255, dtype=np.uint8)
+        alpha[:height // 8, :width // 8] = 0
+        rgba_path = corpus_dir / f"corner_alpha_{label}.png"
+        Image.fromarray(np.dstack([np.asarray(img), alpha])).save(rgba_path)
+        corpus['png'].append(rgba_path)
+
+        # A fade across the left half: stays a PNG
+        alpha = np.full((height, width), 255, dtype=np.uint8)
+        alpha[:, :width // 2] = np.linspace(0, 255, width // 2, dtype=np.uint8)
+        fade_path = corpus_dir / f"fade_alpha_{label}.png"
+        Image.fromarray(np.dstack([np.asarray(img), alpha])).save(fade_path)
+        corpus['png'].append(fade_path)
+    return corpus
+
+def save_master_reference(img_rgb, output_path):
+    """Encode reference pixels with the 'master' profile the enhancers write"""
+    quiet(save_jpeg, Image.fromarray(np.asarray(img_rgb)), output_path, 'master')
+    return output_path
+
+def check_files(label, current, reference, tolerances, results):
+    """
+    Compare two output files (paths, or None if a path failed) and record
+    (label, passed, message, current bytes / reference bytes)
+    """
+    if current is None or reference is None:
+        results.append((label, False, "no output", None))
+        return
+    current, reference = Path(current), Path(reference)
+    if current.suffix != reference.suffix:
+        results.append((label, False, f"format {current.suffix} instead of {reference.suffix}", None))
+        return
+    size_ratio = current.stat().st_size / reference.stat().st_size
+    check_arrays(label, load_rgb(current), load_rgb(reference), tolerances, results, size_ratio)
+
+def check_arrays(label, current, reference, tolerances, results, size_ratio=None):
+    """Compare two RGB arrays against the tolerances and record the result"""
+    current, reference = np.asarray(current), np.asarray(reference)
+    if current.shape != reference.shape:
+        results.append((label, False, f"shape {current.shape} instead of {reference.shape}", None))
+        return
+    metrics = compare_images(current, reference)
+    failures = [name for name, limit in tolerances.items()
+                if (metrics[name] > limit if name.startswith('delta_e') else metrics[name] < limit)]
+    message = format_metrics(metrics)
+    if failures:
+        message += f" - out of tolerance: {', '.join(failures)}"
+    results.append((label, not failures, message, size_ratio))
+
+def check_max_difference(label, current, reference, limit, results):
+    """Record whether two arrays differ by at most limit levels anywhere"""
+    current, reference = np.asarray(current, dtype=np.int16), np.asarray(reference, dtype=np.int16)
+    if current.shape != reference.shape:
+        results.append((label, False, f"shape {current.shape} instead of {reference.shape}", None))
+        return
+    difference = int(np.abs(current - reference).max())
+    results.append((label, difference <= limit, f"max difference {difference} level(s)", None))
+
+def run_compression_checks(corpus, work_dir, results):
+    """compress_jpeg and compress_png against compress_reference.py"""
+    work_dir = Path(work_dir)
+    for image_path in corpus['jpeg']:
+        for max_dimension in (None, 200):
+            suffix = f"_max{max_dimension}" if max_dimension else ""
+            current = work_dir / f"{image_path.stem}{suffix}_current.jpg"
+            reference = work_dir / f"{image_path.stem}{suffix}_reference.jpg"
+            ok = quiet(compress_images.compress_jpeg, image_path, current, 85, max_dimension)
+            ok_ref = quiet(compress_reference.compress_jpeg_reference, image_path, reference, 85, max_dimension)
+            check_files(f"compress_jpeg {image_path.name}{' ≤' + str(max_dimension) if max_dimension else ''}",
+                        current if ok else None, reference if ok_ref else None,
+                        ENCODED_TOLERANCES, results)
+
+    for image_path in corpus['png']:
+        _, current = quiet(compress_images.compress_png, image_path,
+                           work_dir / f"{image_path.stem}_current.png", 85, None)
+        _, reference = quiet(compress_reference.compress_png_reference, image_path,
+                             work_dir / f"{image_path.stem}_reference.png", 85, None)
+        check_files(f"compress_png {image_path.name}", current, reference, ENCODED_TOLERANCES, results)
+
+def run_enhancement_checks(corpus, work_dir, results):
+    """Enhancement paths, in memory and file to file, against enhance_reference.py"""
+    work_dir = Path(work_dir)
+    for image_path in corpus['jpeg']:
+        name = image_path.name
+
+        # PIL path (the references build their masks pixel by pixel)
+        img = Image.open(image_path)
+        check_arrays(f"enhance_pil_image_advanced {name}",
+                     enhance_images_ai.enhance_pil_image_advanced(img),
+                     enhance_reference.enhance_pil_image_advanced_reference(img),
+                     IN_MEMORY_TOLERANCES, results)
+        current = work_dir / f"{image_path.stem}_pil_current.jpg"
+        ok = quiet(enhance_images_ai.enhance_image_pil_advanced, image_path, current)
+        reference = save_master_reference(enhance_reference.enhance_pil_image_advanced_reference(img),
+                                          work_dir / f"{image_path.stem}_pil_reference.jpg")
+        check_files(f"enhance_image_pil_advanced {name}", current if ok else None,
+                    reference, PIL_MASTER_TOLERANCES, results)
+
+        if not enhance_images_ai.OPENCV_AVAILABLE:
+            results.append((f"enhance_image_advanced {name}", None, "OpenCV not installed", None))
+            continue
+
+        img_bgr = cv2.imread(str(image_path))
+        reference_rgb = enhance_reference.enhance_array_advanced_reference(img_bgr)
+        check_arrays(f"enhance_array_advanced {name}",
+                     enhance_images_ai.enhance_array_advanced(img_bgr),
+                     reference_rgb, IN_MEMORY_TOLERANCES, results)
+        current = work_dir / f"{image_path.stem}_cv_current.jpg"
+        ok = quiet(enhance_images_ai.enhance_image_advanced, image_path, current,
+                   plan=enhance_images_ai.DEFAULT_ENHANCEMENT_PLAN)
+        reference = save_master_reference(reference_rgb, work_dir / f"{image_path.stem}_cv_reference.jpg")
+        check_files(f"enhance_image_advanced {name}", current if ok else None,
+                    reference, MASTER_TOLERANCES, results)
+
+def run_mask_checks(results):
+    """
+    apply_vignette_pil against the reference on images with alpha, which
+    go through a different broadcast than RGB
+    """
+    for width, height in CORPUS_SIZES:
+        rgb = np.asarray(make_test_image(width, height))
+        alpha = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+        for mode, pixels in (('RGBA', np.dstack([rgb, alpha])),
+                             ('LA', np.dstack([luma(rgb).astype(np.uint8), alpha]))):
+            img = Image.fromarray(pixels, mode)
+            current = np.asarray(enhance_images_ai.apply_vignette_pil(img), dtype=np.int16)
+            reference = np.asarray(enhance_reference.apply_vignette_pil_reference(img), dtype=np.int16)
+            check_max_difference(f"apply_vignette_pil {mode} {width}x{height}",
+                                 current, reference, 1, results)
+
+def run_batch_checks(results, count=3):
+    """
+    enhance_batch_advanced against enhance_array_advanced on same-size
+    stacks; batching must not change a single pixel
+    """
+    if not enhance_images_ai.OPENCV_AVAILABLE:
+        results.append(("enhance_batch_advanced", None, "OpenCV not installed", None))
+        return
+    for width, height in CORPUS_SIZES:
+        batch = np.stack([cv2.cvtColor(np.asarray(make_test_image(width, height, seed=seed)),
+                                       cv2.COLOR_RGB2BGR) for seed in range(count)])
+        batched = enhance_images_ai.enhance_batch_advanced(batch.copy())
+        for seed, img_bgr in enumerate(batch):
+            check_max_difference(f"enhance_batch_advanced {width}x{height} [{seed}]", batched[seed],
+                                 enhance_images_ai.enhance_array_advanced(img_bgr), 0, results)
+
+def frame_pipeline_enhance(image_path, adaptive=False):
+    """
+    Run the frame pipeline's decode and enhance stages in this process,
+    with the default plan rather than any tuned one
+    Returns the enhanced RGB array, or None if a stage failed
+    """
+    with frame_transport.FramePool() as pool:
+        source = pool.acquire(frame_transport.probe_frame_shape(image_path))
+        enhanced = pool.acquire(source.shape)
+        if not (frame_transport.decode_stage(image_path, source.handle) and
+                frame_transport.enhance_stage(source.handle, enhanced.handle, adaptive,
+                                              enhance_images_ai.DEFAULT_ENHANCEMENT_PLAN)):
+            return None
+        return enhanced.array.copy()
+
+def run_frame_checks(corpus, results):
+    """Frame pipeline decode + enhance stages against the reference"""
+    if not enhance_images_ai.OPENCV_AVAILABLE:
+        results.append(("frame pipeline", None, "OpenCV not installed", None))
+        return
+    for image_path in corpus['jpeg']:
+        enhanced = frame_pipeline_enhance(image_path)
+        if enhanced is None:
+            results.append((f"frame pipeline {image_path.name}", False, "stage failed", None))
+            continue
+        check_arrays(f"frame pipeline {image_path.name}", enhanced,
+                     enhance_reference.enhance_array_advanced_reference(cv2.imread(str(image_path))),
+                     IN_MEMORY_TOLERANCES, results)
+
+def run_adaptive_checks(corpus, results):
+    """
+    Adaptive enhancement: full-strength statistics must reproduce the
+    reference, and the per-image, batch and frame pipeline paths must
+    apply the same statistics-driven plan
+    """
+    if not enhance_images_ai.OPENCV_AVAILABLE:
+        results.append(("adaptive enhancement", None, "OpenCV not installed", None))
+        return
+    for image_path in corpus['jpeg']:
+        name = image_path.name
+        img_bgr = cv2.imread(str(image_path))
+        full_plan = enhance_images_ai.choose_enhancement_plan(FULL_STRENGTH_STATS)
+        check_arrays(f"adaptive full strength {name}",
+                     enhance_images_ai.enhance_array_advanced(img_bgr, full_plan),
+                     enhance_reference.enhance_array_advanced_reference(img_bgr),
+                     IN_MEMORY_TOLERANCES, results)
+
+        plan = enhance_images_ai.choose_enhancement_plan(enhance_images_ai.analyze_image_stats(img_bgr))
+        expected = enhance_images_ai.enhance_array_advanced(img_bgr, plan)
+        check_max_difference(f"adaptive batch {name}",
+                             enhance_images_ai.enhance_batch_advanced(img_bgr[np.newaxis].copy(), plan)[0],
+                             expected, 0, results)
+        enhanced = frame_pipeline_enhance(image_path, adaptive=True)
+        if enhanced is None:
+            results.append((f"adaptive frame pipeline {name}", False, "stage failed", None))
+            continue
+        check_arrays(f"adaptive frame pipeline {name}", enhanced, expected,
+                     IN_MEMORY_TOLERANCES, results)
+
+def print_results(results):
+    """Print one line per check; returns the number of failures"""
+    failures = 0
+    for label, passed, message, size_ratio in results:
+        if passed is None:
+            print(f"⊘ {label}: skipped ({message})")
+            continue
+        size = f", size {size_ratio * 100:.0f}% of reference" if size_ratio else ""
+        print(f"{'✓' if passed else '✗'} {label}")
+        print(f"    {message}{size}")
+        failures += not passed
+    return failures
+
+def benchmark_metrics(width=2048, height=1536):
+    """
+    Time each metric on a synthetic photo and its quality 75 JPEG, and show
+    the memory bound tiling gives SSIM
+    """
+    img = make_test_image(width, height)
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=75)
+    a = np.asarray(img)
+    b = np.asarray(Image.open(buffer).convert('RGB'))
+    luma_a, luma_b = luma(a), luma(b)
+    megapixels = width * height / 1e6
+
+    print(f"{'Metric (' + f'{width}x{height})':<24} {'value':>9} {'time':>9} {'MP/s':>8} {'peak':>10}")
+    print("-" * 78)
+    timings = [
+        ('PSNR', lambda: psnr(a, b)),
+        ('SSIM', lambda: ssim(luma_a, luma_b)),
+        ('SSIM (untiled)', lambda: ssim(luma_a, luma_b, tile=None)),
+        ('MS-SSIM', lambda: ms_ssim(luma_a, luma_b)),
+        ('delta E 2000 (mean)', lambda: delta_e(a, b)['mean']),
+    ]
+    for label, func in timings:
+        value, seconds, peak_mb = measure(func)
+        print(f"{label:<24} {value:9.4f} {seconds:8.3f}s {megapixels / seconds:8.1f} {peak_mb:8.1f}MB")
+
+if __name__ == "__main__":
+    print("=" * 78)
+    print("Golden-Output Parity Check")
+    print("=" * 78)
+    print()
+
+    start = time.perf_counter()
+    results = []
+    with tempfile.TemporaryDirectory(prefix='parity-') as work_dir:
+        corpus = make_corpus(work_dir)
+        run_compression_checks(corpus, work_dir, results)
+        run_enhancement_checks(corpus, work_dir, results)
+        run_mask_checks(results)
+        run_batch_checks(results)
+        run_frame_checks(corpus, results)
+        run_adaptive_checks(corpus, results)
+    failures = print_results(results)
+    print("-" * 78)
+    print(f"{len(results)} check(s), {failures} failed, {time.perf_counter() - start:.1f}s")
+    print()
+
+    benchmark_metrics()
+    print()
+    if failures:
+        print(f"✗ {failures} output(s) drifted from the reference")
+        raise SystemExit(1)
+    print("✓ All outputs match the reference within tolerance")
@@ -279,6 +279,13 @@ install_dependencies() {
         need_install=1
     fi
     
+    if ! python3 -c 'import venv, ensurepip' &> /dev/null; then
+        echo "📦 Installing python3-venv (image service)..."
+        apt update
+        apt install -y python3 python3-venv
+        need_install=1
+    fi
+    
     if ! command -v pm2 &> /dev/null; then
         echo "📦 Installing PM2..."
         if command -v npm &> /dev/null; then
@@ -462,6 +469,11 @@ create_apache_config() {
     RequestHeader set X-Forwarded-Proto "https"
     RequestHeader set X-Forwarded-For "%{REMOTE_ADDR}s"
     
+    # On-demand image renditions (image_service.py) - must come before "ProxyPass /"
+    # See scripts/PROXY/apache-image-service.conf
+    ProxyPass /img/ http://127.0.0.1:5050/ nocanon retry=0 timeout=30
+    ProxyPassReverse /img/ http://127.0.0.1:5050/
+    
     # Proxy requests to the Node.js application
     ProxyPass / http://127.0.0.1:$PORT/
     ProxyPassReverse / http://127.0.0.1:$PORT/
@@ -581,6 +593,19 @@ start_application() {
         echo "✅ Node modules already installed"
     fi
     
+    # Python environment for the image service (image_service.py, proxied at /img/)
+    if [ ! -x "$PROJECT_DIR/.venv/bin/python" ]; then
+        echo "📦 Creating Python environment for the image service..."
+        python3 -m venv "$PROJECT_DIR/.venv"
+    fi
+    echo "📦 Installing Python dependencies..."
+    "$PROJECT_DIR/.venv/bin/pip" install -q -r requirements.txt
+    
+    if [ $? -ne 0 ]; then
+        echo "❌ Python dependency installation failed"
+        return 1
+    fi
+    
     # Build the application
     echo "🔨 Building application..."
     $NPM_CMD run build
@@ -590,15 +615,9 @@ start_application() {
         return 1
     fi
     
-    # Check if application is already running in PM2
-    if $PM2_CMD list 2>/dev/null | grep -q "zeliangmorung"; then
-        echo "🔄 Application already running in PM2, restarting..."
-        $PM2_CMD restart zeliangmorung
-    else
-        echo "🚀 Starting application with PM2..."
-        
-        # Create PM2 ecosystem file (use .cjs extension for CommonJS since package.json has "type": "module")
-        cat > "$PROJECT_DIR/ecosystem.config.cjs" <<EOF
+    # Create PM2 ecosystem file (use .cjs extension for CommonJS since package.json has "type": "module")
+    # Written on every run so existing installs pick up new apps
+    cat > "$PROJECT_DIR/ecosystem.config.cjs" <<EOF
 module.exports = {
   apps: [{
     name: 'zeliangmorung',
@@ -617,17 +636,44 @@ module.exports = {
     autorestart: true,
     watch: false,
     max_memory_restart: '1G'
+  }, {
+    // Image resize service behind Apache's /img/ proxy (port 5050)
+    name: 'zeliangmorung-images',
+    script: 'image_service.py',
+    interpreter: '$PROJECT_DIR/.venv/bin/python',
+    cwd: '$PROJECT_DIR',
+    instances: 1,
+    exec_mode: 'fork',
+    env: {
+      PYTHONUNBUFFERED: '1'
+    },
+    error_file: '$PROJECT_DIR/logs/pm2-images-error.log',
+    out_file: '$PROJECT_DIR/logs/pm2-images-out.log',
+    log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
+    merge_logs: true,
+    autorestart: true,
+    watch: false,
+    max_memory_restart: '1G'
   }]
 };
 EOF
-        
-        # Remove old .js config if it exists
-        if [ -f "$PROJECT_DIR/ecosystem.config.js" ]; then
-            rm "$PROJECT_DIR/ecosystem.config.js"
-        fi
-        
-        # Create logs directory
-        mkdir -p "$PROJECT_DIR/logs"
+    
+    # Remove old .js config if it exists
+    if [ -f "$PROJECT_DIR/ecosystem.config.js" ]; then
+        rm "$PROJECT_DIR/ecosystem.config.js"
+    fi
+    
+    # Create logs directory
+    mkdir -p "$PROJECT_DIR/logs"
+    
+    # Check if application is already running in PM2
+    if $PM2_CMD list 2>/dev/null | grep -q "zeliangmorung"; then
+        echo "🔄 Application already running in PM2, restarting..."
+        # Restarts running apps and starts any that aren't (e.g. the image service)
+        $PM2_CMD startOrRestart ecosystem.config.cjs
+        $PM2_CMD save
+    else
+        echo "🚀 Starting application with PM2..."
         
         # Start with PM2 using .cjs file
         $PM2_CMD start ecosystem.config.cjs
@@ -638,8 +684,13 @@ EOF
     # Wait a moment for the app to start
     sleep 3
     
+    if ! $PM2_CMD list 2>/dev/null | grep -q "zeliangmorung-images.*online"; then
+        echo "⚠️  Image service is not running - /img/ requests will fail"
+        echo "   Check: $PM2_CMD logs zeliangmorung-images --lines 20 --nostream"
+    fi
+    
     # Check if application is running
-    if $PM2_CMD list 2>/dev/null | grep -q "zeliangmorung.*online"; then
+    if $PM2_CMD list 2>/dev/null | grep -qE "zeliangmorung\s.*online"; then
         echo "✅ Application is running successfully"
         echo ""
         echo "📊 PM2 Status:"
@@ -0,0 +1,83 @@
+import fs from "node:fs";
+import path from "node:path";
+import { fileURLToPath } from "node:url";
+import type { ImagePlaceholder } from "@shared/schema";
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
+// Index written by image_placeholders.py (also refreshed by compress_images.py)
+const indexPath = path.resolve(__dirname, "..", "attached_assets", "placeholders.json");
+
+type PlaceholderIndex = Record<string, ImagePlaceholder>;
+
+let cachedMtime = 0;
+let cachedImages: PlaceholderIndex = {};
+
+// Re-read the index only when the file changes on disk
+function loadPlaceholders(): PlaceholderIndex {
+  try {
+    const { mtimeMs } = fs.statSync(indexPath);
+    if (mtimeMs !== cachedMtime) {
+      const index = JSON.parse(fs.readFileSync(indexPath, "utf-8"));
+      cachedImages = index.images ?? {};
+      cachedMtime = mtimeMs;
+    }
+  } catch {
+    // No index yet (or it is mid-write) - keep serving what we have
+  }
+  return cachedImages;
+}
+
+function placeholderFor(src: string, images: PlaceholderIndex): ImagePlaceholder | undefined {
+  if (!src.startsWith("/assets/")) {
+    return undefined;
+  }
+  let name = src.slice("/assets/".length);
+  try {
+    name = decodeURIComponent(name);
+  } catch {
+    // Not URL-encoded, use as-is
+  }
+  const entry = images[name];
+  if (!entry) {
+    return undefined;
+  }
+  const { width, height, blurhash, dominantColor, placeholder } = entry;
+  return { width, height, blurhash, dominantColor, placeholder };
+}
+
+function attachPlaceholders(value: unknown, images: PlaceholderIndex): unknown {
+  if (Array.isArray(value)) {
+    return value.map(item => attachPlaceholders(item, images));
+  }
+  if (value === null || typeof value !== "object") {
+    return value;
+  }
+
+  const result: Record<string, unknown> = {};
+  const placeholders: PlaceholderIndex = {};
+  for (const [key, field] of Object.entries(value)) {
+    result[key] = attachPlaceholders(field, images);
+
+    // Image paths are either plain string fields or arrays of strings
+    const sources = typeof field === "string" ? [field]
+      : Array.isArray(field) ? field.filter((item): item is string => typeof item === "string")
+      : [];
+    for (const src of sources) {
+      const placeholder = placeholderFor(src, images);
+      if (placeholder) {
+        placeholders[src] = placeholder;
+      }
+    }
+  }
+  if (Object.keys(placeholders).length > 0) {
+    result.imagePlaceholders = placeholders;
+  }
+  return result;
+}
+
+// Return a copy of the data where every object referencing /assets images
+// gets an imagePlaceholders map (image path -> placeholder data)
+export function withPlaceholders<T>(data: T): T {
+  return attachPlaceholders(data, loadPlaceholders()) as T;
+}
@@ -8,6 +8,7 @@ import { festivals } from "./data/festivals";
 import { morungData } from "./data/morung";
 import { glossaryTerms } from "./data/glossary";
 import { storage } from "./storage";
+import { withPlaceholders } from "./placeholders";
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 
@@ -35,7 +36,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
   // Get all villages
   app.get("/api/villages", (req, res) => {
-    res.json(villages);
+    res.json(withPlaceholders(villages));
   });
 
   // Get single village by ID
@@ -44,17 +45,17 @@ export async function registerRoutes(app: Express): Promise<Server> {
     if (!village) {
       return res.status(404).json({ error: "Village not found" });
     }
-    res.json(village);
+    res.json(withPlaceholders(village));
   });
 
   // Get all festivals
   app.get("/api/festivals", (req, res) => {
-    res.json(festivals);
+    res.json(withPlaceholders(festivals));
   });
 
   // Get morung information
   app.get("/api/morung", (req, res) => {
-    res.json(morungData);
+    res.json(withPlaceholders(morungData));
   });
 
   // Get glossary terms
@@ -1,5 +1,17 @@
 import { z } from "zod";
 
+// Low-quality image placeholder generated by image_placeholders.py
+export interface ImagePlaceholder {
+  width: number;
+  height: number;
+  blurhash: string;
+  dominantColor: string;
+  placeholder: string; // Tiny blurred WebP as a data URI
+}
+
+// Placeholders keyed by image path, merged into API responses by the server
+export type ImagePlaceholders = Record<string, ImagePlaceholder>;
+
 // Village data structure
 export interface Village {
   id: string;
@@ -11,6 +23,7 @@ export interface Village {
   description: string;
   attractions: string[];
   additionalImages?: string[]; // Optional array for additional images
+  imagePlaceholders?: ImagePlaceholders;
 }
 
 // Festival data structure
@@ -22,6 +35,7 @@ export interface Festival {
   description: string;
   imageSrc?: string;
   highlight?: string;
+  imagePlaceholders?: ImagePlaceholders;
 }
 
 // Morung section data structure
@@ -29,6 +43,7 @@ export interface MorungSectionData {
   title: string;
   content: string;
   imageSrc?: string; // Optional image for each section
+  imagePlaceholders?: ImagePlaceholders;
 }
 
 // Glossary term data structure
@@ -48,5 +63,6 @@ export type MorungResponse = {
   interiorImageSrc: string;
   additionalImages?: string[];
   sections: MorungSectionData[];
+  imagePlaceholders?: ImagePlaceholders;
 };
 export type GlossaryResponse = GlossaryTerm[];
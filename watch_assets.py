@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Asset Watch Daemon
+Watches the assets directory and optimizes new or changed images within
+seconds, instead of waiting for the next manual or cron batch run
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from PIL import Image, ImageFile
+
+from compress_images import backup_image, compress_image, get_file_size_mb
+from image_placeholders import INDEX_FILENAME, load_placeholder_index, update_placeholder_index
+
+# Supported image extensions
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+
+# inotify event masks (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+# Signatures of the files the daemon wrote, kept across restarts so the
+# startup catch-up doesn't enhance or recompress them a second time
+WRITTEN_FILENAME = '.watch_assets.json'
+
+class InotifyWatcher:
+    """
+    Linux inotify subscription on a single directory (via libc, no extra
+    packages). poll() returns the names of files that had events.
+    """
+
+    def __init__(self, directory):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        wd = self.libc.inotify_add_watch(self.fd, str(directory).encode(), WATCH_MASK)
+        if wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+        self.directory = Path(directory)
+
+    def poll(self, timeout):
+        """
+        Wait up to timeout seconds for events
+        Returns (changed names, overflowed) - on overflow the caller rescans
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set(), False
+        names = set()
+        overflowed = False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names, False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode(errors='surrogateescape')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+            elif name:
+                names.add(name)
+        return names, overflowed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """
+    Fallback for platforms without inotify: compares directory snapshots
+    of (size, mtime) every interval
+    """
+
+    def __init__(self, directory, interval=2.0):
+        self.directory = Path(directory)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        names = {name for name, sig in current.items() if self.snapshot.get(name) != sig}
+        names |= set(self.snapshot) - set(current)
+        self.snapshot = current
+        return names, False
+
+    def close(self):
+        pass
+
+def create_watcher(directory, poll_interval=2.0):
+    """Use inotify where available, otherwise fall back to polling"""
+    try:
+        watcher = InotifyWatcher(directory)
+        print("Using inotify for filesystem events")
+        return watcher
+    except (OSError, AttributeError) as e:
+        print(f"inotify not available ({e}), polling every {poll_interval}s")
+        return PollingWatcher(directory, interval=poll_interval)
+
+def file_signature(path):
+    """(size, mtime_ns) of a file, or None if it is gone"""
+    try:
+        stat = path.stat()
+        return (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return None
+
+def is_complete_image(path):
+    """
+    Check that an image file decodes completely (not still being written)
+
+    verify() only checks the structure, and a JPEG cut off mid-upload still
+    decodes to a full-size array with a warning, so the whole file is
+    decoded here with truncated images treated as errors.
+    """
+    load_truncated = ImageFile.LOAD_TRUNCATED_IMAGES
+    ImageFile.LOAD_TRUNCATED_IMAGES = False
+    try:
+        with Image.open(path) as img:
+            img.load()
+        return True
+    except Exception:
+        return False
+    finally:
+        ImageFile.LOAD_TRUNCATED_IMAGES = load_truncated
+
+def is_watched_image(name):
+    """Images we optimize - skips backups, temp files and the placeholder index"""
+    return (Path(name).suffix in IMAGE_EXTENSIONS and not name.startswith('.')
+            and '.backup.' not in name and name != INDEX_FILENAME)
+
+class AssetWatcher:
+    """
+    Debounces filesystem events and feeds settled images through the
+    compress pipeline (and optionally enhancement)
+
+    A file is processed once it has had no events for settle_seconds and
+    its size and mtime are unchanged between two checks. Files this daemon
+    wrote itself are remembered by signature (in WRITTEN_FILENAME, across
+    restarts) so they don't loop back in.
+    """
+
+    def __init__(self, directory, quality=85, max_dimension=2048, min_size_mb=1.0,
+                 create_backup=True, enhance=False, settle_seconds=2.0, poll_interval=2.0):
+        self.directory = Path(directory)
+        self.quality = quality
+        self.max_dimension = max_dimension
+        self.min_size_mb = min_size_mb
+        self.backup_dir = self.directory / 'backups' if create_backup else None
+        self.enhance = enhance
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        # name -> (time of last event, signature seen at that time)
+        self.pending = {}
+        # name -> signature of the file as this daemon last wrote it
+        self.written_path = self.directory / WRITTEN_FILENAME
+        self.written = self._load_written()
+        self.processed_count = 0
+
+    def _load_written(self):
+        try:
+            with open(self.written_path, 'r', encoding='utf-8') as f:
+                return {name: tuple(signature) for name, signature in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_written(self):
+        temp_path = self.written_path.with_suffix('.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.written, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.written_path)
+
+    def _queue(self, names):
+        now = time.monotonic()
+        for name in names:
+            if is_watched_image(name):
+                self.pending[name] = (now, file_signature(self.directory / name))
+
+    def _settled(self):
+        """Pop and return names whose files have stopped changing"""
+        now = time.monotonic()
+        ready = []
+        for name, (last_event, last_signature) in list(self.pending.items()):
+            if now - last_event < self.settle_seconds:
+                continue
+            signature = file_signature(self.directory / name)
+            if signature != last_signature:
+                # Still growing - check again after another settle period
+                self.pending[name] = (now, signature)
+                continue
+            del self.pending[name]
+            ready.append(name)
+        return ready
+
+    def process(self, name):
+        """Run one settled image through the pipeline"""
+        image_path = self.directory / name
+        signature = file_signature(image_path)
+        index_path = self.directory / INDEX_FILENAME
+
+        if signature is None:
+            # Deleted or moved away - drop it from the placeholder index
+            if self.written.pop(name, None):
+                self._save_written()
+            update_placeholder_index([image_path], index_path)
+            return
+        if self.written.get(name) == signature:
+            return
+        if not is_complete_image(image_path):
+            print(f"⊘ {name} - not a complete image yet, waiting")
+            self.pending[name] = (time.monotonic(), signature)
+            return
+
+        start = time.perf_counter()
+        print(f"→ {name}")
+        output_path = image_path
+        # Only back up files that are about to be rewritten; compress_image
+        # leaves anything under min_size_mb alone
+        if self.backup_dir and (self.enhance or get_file_size_mb(image_path) >= self.min_size_mb):
+            backup_image(image_path, self.backup_dir)
+
+        if self.enhance:
+            from enhance_images_ai import enhance_image_advanced
+            enhance_image_advanced(image_path, image_path)
+
+        compress_image(image_path, quality=self.quality, max_dimension=self.max_dimension,
+                       backup_dir=self.backup_dir, min_size_mb=self.min_size_mb)
+        if not image_path.exists() and image_path.with_suffix('.jpg').exists():
+            # PNG converted to JPEG
+            update_placeholder_index([image_path], index_path)
+            output_path = image_path.with_suffix('.jpg')
+
+        self.written[output_path.name] = file_signature(output_path)
+        if output_path != image_path:
+            self.written.pop(name, None)
+        self._save_written()
+        update_placeholder_index([output_path], index_path)
+        self.processed_count += 1
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+    def unindexed_images(self):
+        """
+        Watched images with no placeholder index entry, or whose size or
+        mtime no longer match it - added or changed while the daemon was down
+        """
+        indexed = load_placeholder_index(self.directory / INDEX_FILENAME)['images']
+        names = set()
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not is_watched_image(entry.name):
+                continue
+            stat = entry.stat()
+            known = indexed.get(entry.name)
+            if (not known or known.get('size') != stat.st_size
+                    or known.get('mtime') != int(stat.st_mtime)):
+                names.add(entry.name)
+        return names
+
+    def run(self, max_seconds=None):
+        """
+        Watch until interrupted (or for max_seconds, if given)
+        """
+        if self.enhance:
+            # Refuse to start on a broken enhancement_plan.json rather than
+            # failing every upload
+            from enhance_images_ai import tuned_enhancement_plan
+            tuned_enhancement_plan()
+        watcher = create_watcher(self.directory, poll_interval=self.poll_interval)
+        started = time.monotonic()
+        print(f"Watching: {self.directory}")
+        print(f"Quality: {self.quality}, Max dimension: {self.max_dimension}px, "
+              f"settle time: {self.settle_seconds}s")
+        print("-" * 70)
+        missing = self.unindexed_images()
+        # Files the daemon already wrote only need their placeholders
+        done = {name for name in missing
+                if self.written.get(name) == file_signature(self.directory / name)}
+        if done:
+            update_placeholder_index([self.directory / name for name in sorted(done)],
+                                     self.directory / INDEX_FILENAME)
+        if missing - done:
+            print(f"Queueing {len(missing - done)} image(s) missing from {INDEX_FILENAME}")
+            self._queue(missing - done)
+        try:
+            while max_seconds is None or time.monotonic() - started < max_seconds:
+                timeout = self.settle_seconds / 2 if self.pending else 60
+                if max_seconds is not None:
+                    timeout = min(timeout, max(0.0, max_seconds - (time.monotonic() - started)))
+                names, overflowed = watcher.poll(timeout)
+                if overflowed:
+                    # Kernel queue overflowed - fall back to a full rescan
+                    names = {entry.name for entry in os.scandir(self.directory) if entry.is_file()}
+                self._queue(names)
+                for name in self._settled():
+                    try:
+                        self.process(name)
+                    except Exception as e:
+                        print(f"✗ Error processing {name}: {str(e)}")
+        except KeyboardInterrupt:
+            print()
+        finally:
+            watcher.close()
+        print("-" * 70)
+        print(f"Stopped watching, {self.processed_count} image(s) processed")
+
+if __name__ == "__main__":
+    script_dir = Path(__file__).parent
+    assets_dir = script_dir / "attached_assets"
+
+    print("=" * 70)
+    print("Asset Watch Daemon")
+    print("=" * 70)
+
+    # Same settings as compress_images.py; set enhance=True to also run
+    # enhance_images_ai.py's enhancement on new uploads
+    AssetWatcher(
+        assets_dir,
+        quality=85,
+        max_dimension=2048,
+        min_size_mb=1.0,
+        create_backup=True,
+        enhance=False,
+        settle_seconds=2.0
+    ).run()